@@ -201,7 +201,7 @@ class AutonomousToolExecutorAgent(EnhancedToolExecutorAgent):
             
             # Step 2: Classify the error
             self.recovery_logger.info(f"🔍 Classifying error for task {task.task_id}")
-            error_analysis = self.error_classifier.analyze_error(error_context)
+            error_analysis = await self.error_classifier.analyze_error_async(error_context)
             
             # Log error analysis
             self._log_error_analysis(error_analysis)
@@ -16,12 +16,14 @@ Author: Claude Code Assistant
 Date: 2025-01-26
 """
 
+import asyncio
 import json
 import logging
 import re
+import sys
 import time
 from datetime import datetime
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, Callable, List, NamedTuple, Optional, Pattern, Tuple
 from dataclasses import dataclass, asdict
 from enum import Enum
 
@@ -45,6 +47,55 @@ class ErrorSeverity(Enum):
     CRITICAL = "critical" # System failures, data loss risks
 
 
+# Interned enum values, prebuilt so serialization skips the `.value` lookup
+_CAT_VALUE = {c: sys.intern(c.value) for c in ErrorCategory}
+_SEV_VALUE = {s: sys.intern(s.value) for s in ErrorSeverity}
+
+
+# Shared, immutable fix suggestions returned by the fix generators
+_GENERIC_FIXES = (
+    "Check command syntax and arguments",
+    "Verify all dependencies are installed",
+    "Review error message for specific guidance"
+)
+_NPM_FIXES = (
+    "Clear npm cache: npm cache clean --force",
+    "Delete node_modules and reinstall: rm -rf node_modules && npm install",
+    "Check package.json for syntax errors"
+)
+_COMMAND_NOT_FOUND_FIXES = (
+    "Check if command is installed",
+    "Verify command is in PATH",
+    "Install required package or tool"
+)
+_NO_SUCH_FILE_FIXES = (
+    "Check file path spelling",
+    "Verify file exists in current directory",
+    "Use absolute path instead of relative path"
+)
+_PERMISSION_DENIED_FIXES = (
+    "Run with sudo if system operation required",
+    "Change file permissions: chmod +x filename",
+    "Check file ownership: chown user:group filename"
+)
+_PORT_IN_USE_FIXES = (
+    "Kill process using port: lsof -ti:PORT | xargs kill -9",
+    "Use different port number",
+    "Check for running services"
+)
+
+
+class PatternTable(NamedTuple):
+    """Error patterns for one category, stored as parallel columns indexed by position."""
+    ids: Tuple[str, ...]
+    patterns: Tuple[str, ...]
+    patterns_re: Tuple[Pattern, ...]
+    severities: Tuple[ErrorSeverity, ...]
+    descriptions: Tuple[str, ...]
+    extract_res: Tuple[Optional[Pattern], ...]
+    research_keywords: Tuple[Tuple[str, ...], ...]
+
+
 @dataclass
 class ErrorContext:
     """Context information about an error."""
@@ -86,8 +137,8 @@ class ErrorAnalysis:
         """Convert to dictionary for serialization."""
         return {
             'error_id': self.error_id,
-            'category': self.category.value,
-            'severity': self.severity.value,
+            'category': _CAT_VALUE[self.category],
+            'severity': _SEV_VALUE[self.severity],
             'primary_message': self.primary_message,
             'secondary_messages': self.secondary_messages,
             'error_patterns': self.error_patterns,
@@ -122,16 +173,52 @@ class ErrorClassifier:
         # Error pattern definitions
         self.error_patterns = self._initialize_error_patterns()
         
+        # Fix generators keyed by pattern id
+        self._fix_generators = self._initialize_fix_generators()
+        
         # LLM analysis templates
         self.analysis_templates = self._initialize_analysis_templates()
         
         self.logger.info("ErrorClassifier initialized")
     
-    def _initialize_error_patterns(self) -> Dict[ErrorCategory, List[Dict[str, Any]]]:
-        """Initialize error pattern definitions for different categories."""
+    def _initialize_error_patterns(self) -> Dict[ErrorCategory, PatternTable]:
+        """Build per-category pattern tables with precompiled regexes."""
+        flags = re.IGNORECASE | re.MULTILINE
+        tables = {}
+        
+        for category, definitions in self._error_pattern_definitions().items():
+            tables[category] = PatternTable(
+                ids=tuple(d['id'] for d in definitions),
+                patterns=tuple(d['pattern'] for d in definitions),
+                patterns_re=tuple(re.compile(d['pattern'], flags) for d in definitions),
+                severities=tuple(d['severity'] for d in definitions),
+                descriptions=tuple(d['description'] for d in definitions),
+                extract_res=tuple(
+                    re.compile(d['extract_message'], flags) if d.get('extract_message') else None
+                    for d in definitions
+                ),
+                research_keywords=tuple(tuple(d['research_keywords']) for d in definitions)
+            )
+        
+        return tables
+    
+    def _initialize_fix_generators(self) -> Dict[str, Callable[[ErrorContext], Tuple[str, ...]]]:
+        """Map pattern ids to callables producing suggested fixes."""
+        return {
+            'py_module_not_found': self._module_not_found_fixes,
+            'npm_err': lambda context: _NPM_FIXES,
+            'cmd_not_found': lambda context: _COMMAND_NOT_FOUND_FIXES,
+            'no_such_file': lambda context: _NO_SUCH_FILE_FIXES,
+            'permission_denied': lambda context: _PERMISSION_DENIED_FIXES,
+            'port_in_use': lambda context: _PORT_IN_USE_FIXES
+        }
+    
+    def _error_pattern_definitions(self) -> Dict[ErrorCategory, List[Dict[str, Any]]]:
+        """Error pattern definitions for different categories."""
         return {
             ErrorCategory.CODE_ERROR: [
                 {
+                    'id': 'py_traceback',
                     'pattern': r'Traceback \(most recent call last\):',
                     'severity': ErrorSeverity.MEDIUM,
                     'description': 'Python traceback',
@@ -139,6 +226,7 @@ class ErrorClassifier:
                     'research_keywords': ['python', 'traceback', 'error']
                 },
                 {
+                    'id': 'py_syntax_error',
                     'pattern': r'SyntaxError: (.+)',
                     'severity': ErrorSeverity.MEDIUM,
                     'description': 'Python syntax error',
@@ -146,6 +234,7 @@ class ErrorClassifier:
                     'research_keywords': ['python', 'syntax error']
                 },
                 {
+                    'id': 'py_module_not_found',
                     'pattern': r'ModuleNotFoundError: No module named (.+)',
                     'severity': ErrorSeverity.MEDIUM,
                     'description': 'Missing Python module',
@@ -153,6 +242,7 @@ class ErrorClassifier:
                     'research_keywords': ['python', 'module not found', 'install package']
                 },
                 {
+                    'id': 'npm_err',
                     'pattern': r'npm ERR!',
                     'severity': ErrorSeverity.MEDIUM,
                     'description': 'NPM error',
@@ -160,6 +250,7 @@ class ErrorClassifier:
                     'research_keywords': ['npm', 'node', 'package manager']
                 },
                 {
+                    'id': 'rust_compile_error',
                     'pattern': r'error: (.+)\n.*\n.*\-\-\> (.+)',
                     'severity': ErrorSeverity.MEDIUM,
                     'description': 'Rust compilation error',
@@ -170,6 +261,7 @@ class ErrorClassifier:
             
             ErrorCategory.COMMAND_SYNTAX: [
                 {
+                    'id': 'cmd_not_found',
                     'pattern': r'command not found',
                     'severity': ErrorSeverity.MEDIUM,
                     'description': 'Command not found',
@@ -177,6 +269,7 @@ class ErrorClassifier:
                     'research_keywords': ['bash', 'command not found', 'install']
                 },
                 {
+                    'id': 'no_such_file',
                     'pattern': r'No such file or directory',
                     'severity': ErrorSeverity.MEDIUM,
                     'description': 'File or directory not found',
@@ -184,6 +277,7 @@ class ErrorClassifier:
                     'research_keywords': ['file not found', 'path']
                 },
                 {
+                    'id': 'invalid_option',
                     'pattern': r'invalid option',
                     'severity': ErrorSeverity.LOW,
                     'description': 'Invalid command option',
@@ -191,6 +285,7 @@ class ErrorClassifier:
                     'research_keywords': ['command options', 'help']
                 },
                 {
+                    'id': 'usage_error',
                     'pattern': r'usage: (.+)',
                     'severity': ErrorSeverity.LOW,
                     'description': 'Command usage error',
@@ -201,6 +296,7 @@ class ErrorClassifier:
             
             ErrorCategory.SYSTEM_ERROR: [
                 {
+                    'id': 'permission_denied',
                     'pattern': r'Permission denied',
                     'severity': ErrorSeverity.HIGH,
                     'description': 'Permission denied',
@@ -208,6 +304,7 @@ class ErrorClassifier:
                     'research_keywords': ['permission denied', 'chmod', 'sudo']
                 },
                 {
+                    'id': 'connection_refused',
                     'pattern': r'Connection refused',
                     'severity': ErrorSeverity.MEDIUM,
                     'description': 'Connection refused',
@@ -215,6 +312,7 @@ class ErrorClassifier:
                     'research_keywords': ['connection refused', 'server', 'port']
                 },
                 {
+                    'id': 'port_in_use',
                     'pattern': r'Port \d+ is already in use',
                     'severity': ErrorSeverity.MEDIUM,
                     'description': 'Port already in use',
@@ -222,6 +320,7 @@ class ErrorClassifier:
                     'research_keywords': ['port in use', 'kill process']
                 },
                 {
+                    'id': 'disk_full',
                     'pattern': r'No space left on device',
                     'severity': ErrorSeverity.CRITICAL,
                     'description': 'Disk space full',
@@ -232,6 +331,7 @@ class ErrorClassifier:
             
             ErrorCategory.NETWORK_ERROR: [
                 {
+                    'id': 'dns_failure',
                     'pattern': r'Could not resolve host',
                     'severity': ErrorSeverity.MEDIUM,
                     'description': 'DNS resolution failure',
@@ -239,6 +339,7 @@ class ErrorClassifier:
                     'research_keywords': ['DNS', 'network', 'host resolution']
                 },
                 {
+                    'id': 'connection_timeout',
                     'pattern': r'Connection timed out',
                     'severity': ErrorSeverity.MEDIUM,
                     'description': 'Connection timeout',
@@ -249,6 +350,7 @@ class ErrorClassifier:
             
             ErrorCategory.DEPENDENCY_ERROR: [
                 {
+                    'id': 'package_not_found',
                     'pattern': r'Package (.+) not found',
                     'severity': ErrorSeverity.MEDIUM,
                     'description': 'Missing package',
@@ -256,6 +358,7 @@ class ErrorClassifier:
                     'research_keywords': ['package manager', 'install package']
                 },
                 {
+                    'id': 'version_conflict',
                     'pattern': r'version conflict',
                     'severity': ErrorSeverity.MEDIUM,
                     'description': 'Version conflict',
@@ -266,6 +369,7 @@ class ErrorClassifier:
             
             ErrorCategory.CONFIGURATION_ERROR: [
                 {
+                    'id': 'config_not_found',
                     'pattern': r'Config file not found',
                     'severity': ErrorSeverity.MEDIUM,
                     'description': 'Missing configuration file',
@@ -273,6 +377,7 @@ class ErrorClassifier:
                     'research_keywords': ['config file', 'configuration']
                 },
                 {
+                    'id': 'invalid_config',
                     'pattern': r'Invalid configuration',
                     'severity': ErrorSeverity.MEDIUM,
                     'description': 'Invalid configuration',
@@ -331,33 +436,76 @@ Query:"""
             pattern_analysis = self._classify_by_patterns(context)
             
             # Step 2: LLM-based analysis (if model available)
-            if self.model:
-                llm_analysis = self._analyze_with_llm(context)
-                # Merge pattern and LLM analysis
-                analysis = self._merge_analysis_results(pattern_analysis, llm_analysis, context)
-            else:
-                analysis = pattern_analysis
-                analysis.confidence *= 0.8  # Reduce confidence without LLM
+            llm_analysis = self._analyze_with_llm(context) if self.model else None
             
-            # Step 3: Generate research query
-            analysis.research_query = self._generate_research_query(analysis, context)
+            return self._finalize_analysis(pattern_analysis, llm_analysis, context, analysis_start)
             
-            # Step 4: Determine recovery workflow requirements
-            analysis.requires_code_fix = self._requires_code_fix(analysis)
-            analysis.requires_command_retry = self._requires_command_retry(analysis)
+        except Exception as e:
+            self.logger.error(f"Error analysis failed: {e}")
+            # Return fallback analysis
+            return self._create_fallback_analysis(context, error_id, time.time() - analysis_start)
+    
+    async def analyze_error_async(self, context: ErrorContext) -> ErrorAnalysis:
+        """
+        Analyze an error, overlapping the LLM call with pattern classification.
+        
+        Args:
+            context: Error context with command output and metadata
             
-            analysis_time = time.time() - analysis_start
-            analysis.analysis_time = analysis_time
+        Returns:
+            ErrorAnalysis with classification and recommendations
+        """
+        analysis_start = time.time()
+        error_id = self._generate_error_id(context)
+        
+        self.logger.info(f"Analyzing error {error_id}: {context.command}")
+        
+        llm_future = None
+        try:
+            # Step 1: Submit the blocking LLM call first so it runs while patterns are matched
+            if self.model:
+                llm_future = asyncio.get_running_loop().run_in_executor(
+                    None, self._analyze_with_llm, context
+                )
             
-            self.logger.info(f"Error analysis complete: {analysis.category.value} [{analysis.severity.value}] in {analysis_time:.3f}s")
+            # Step 2: Pattern-based classification
+            pattern_analysis = self._classify_by_patterns(context)
+            
+            llm_analysis = await llm_future if llm_future is not None else None
             
-            return analysis
+            return self._finalize_analysis(pattern_analysis, llm_analysis, context, analysis_start)
             
         except Exception as e:
+            if llm_future is not None:
+                llm_future.cancel()
             self.logger.error(f"Error analysis failed: {e}")
             # Return fallback analysis
             return self._create_fallback_analysis(context, error_id, time.time() - analysis_start)
     
+    def _finalize_analysis(self, pattern_analysis: ErrorAnalysis, llm_analysis: Optional[Dict[str, Any]],
+                           context: ErrorContext, analysis_start: float) -> ErrorAnalysis:
+        """Merge LLM results and derive research query and recovery requirements."""
+        if llm_analysis is not None:
+            # Merge pattern and LLM analysis
+            analysis = self._merge_analysis_results(pattern_analysis, llm_analysis, context)
+        else:
+            analysis = pattern_analysis
+            analysis.confidence *= 0.8  # Reduce confidence without LLM
+        
+        # Generate research query
+        analysis.research_query = self._generate_research_query(analysis, context)
+        
+        # Determine recovery workflow requirements
+        analysis.requires_code_fix = self._requires_code_fix(analysis)
+        analysis.requires_command_retry = self._requires_command_retry(analysis)
+        
+        analysis_time = time.time() - analysis_start
+        analysis.analysis_time = analysis_time
+        
+        self.logger.info(f"Error analysis complete: {analysis.category.value} [{analysis.severity.value}] in {analysis_time:.3f}s")
+        
+        return analysis
+    
     def _generate_error_id(self, context: ErrorContext) -> str:
         """Generate unique error ID."""
         timestamp = int(time.time() * 1000)
@@ -372,41 +520,38 @@ Query:"""
         best_confidence = 0.0
         
         # Check patterns for each category
-        for category, patterns in self.error_patterns.items():
-            for pattern_info in patterns:
-                pattern = pattern_info['pattern']
-                
-                if re.search(pattern, error_text, re.IGNORECASE | re.MULTILINE):
+        for category, table in self.error_patterns.items():
+            for i, pattern_re in enumerate(table.patterns_re):
+                if pattern_re.search(error_text):
                     confidence = 0.8  # Base confidence for pattern match
                     
                     # Extract specific error messages
-                    extract_pattern = pattern_info.get('extract_message')
-                    if extract_pattern:
-                        match = re.search(extract_pattern, error_text, re.IGNORECASE | re.MULTILINE)
-                        if match:
-                            confidence += 0.1
+                    extract_re = table.extract_res[i]
+                    if extract_re is not None and extract_re.search(error_text):
+                        confidence += 0.1
                     
                     if confidence > best_confidence:
                         best_confidence = confidence
-                        best_match = (category, pattern_info)
+                        best_match = (category, i)
         
         # Create analysis from best match
         if best_match:
-            category, pattern_info = best_match
+            category, index = best_match
+            table = self.error_patterns[category]
             
             # Extract primary error message
-            primary_message = self._extract_primary_message(context, pattern_info)
+            primary_message = self._extract_primary_message(context, category, index)
             
             # Generate suggested fixes based on pattern
-            suggested_fixes = self._generate_pattern_fixes(category, pattern_info, context)
+            suggested_fixes = self._generate_pattern_fixes(table.ids[index], context)
             
             return ErrorAnalysis(
                 error_id="",  # Will be set by caller
                 category=category,
-                severity=pattern_info['severity'],
+                severity=table.severities[index],
                 primary_message=primary_message,
                 secondary_messages=[],
-                error_patterns=[pattern_info['pattern']],
+                error_patterns=[table.patterns[index]],
                 suggested_fixes=suggested_fixes,
                 research_query="",  # Will be generated later
                 requires_code_fix=False,  # Will be determined later
@@ -419,12 +564,12 @@ Query:"""
             # No pattern match - create unknown error analysis
             return self._create_unknown_analysis(context)
     
-    def _extract_primary_message(self, context: ErrorContext, pattern_info: Dict[str, Any]) -> str:
+    def _extract_primary_message(self, context: ErrorContext, category: ErrorCategory, index: int) -> str:
         """Extract primary error message from context."""
-        extract_pattern = pattern_info.get('extract_message')
-        if extract_pattern:
+        extract_re = self.error_patterns[category].extract_res[index]
+        if extract_re is not None:
             error_text = f"{context.stderr} {context.stdout}"
-            match = re.search(extract_pattern, error_text, re.IGNORECASE | re.MULTILINE)
+            match = extract_re.search(error_text)
             if match:
                 return match.group(1) if match.groups() else match.group(0)
         
@@ -434,64 +579,26 @@ Query:"""
         
         return f"Command failed with exit code {context.exit_code}"
     
-    def _generate_pattern_fixes(self, category: ErrorCategory, pattern_info: Dict[str, Any], context: ErrorContext) -> List[str]:
+    def _generate_pattern_fixes(self, pattern_id: str, context: ErrorContext) -> List[str]:
         """Generate suggested fixes based on error pattern."""
-        fixes = []
-        
-        if category == ErrorCategory.CODE_ERROR:
-            if 'ModuleNotFoundError' in pattern_info['pattern']:
-                module_match = re.search(r"No module named ['\"](.+?)['\"]", context.stderr)
-                if module_match:
-                    module_name = module_match.group(1)
-                    fixes.extend([
-                        f"Install missing module: pip install {module_name}",
-                        f"Check if module is in requirements.txt",
-                        f"Verify virtual environment is activated"
-                    ])
-            elif 'npm ERR!' in pattern_info['pattern']:
-                fixes.extend([
-                    "Clear npm cache: npm cache clean --force",
-                    "Delete node_modules and reinstall: rm -rf node_modules && npm install",
-                    "Check package.json for syntax errors"
-                ])
-        
-        elif category == ErrorCategory.COMMAND_SYNTAX:
-            if 'command not found' in pattern_info['pattern']:
-                fixes.extend([
-                    "Check if command is installed",
-                    "Verify command is in PATH",
-                    "Install required package or tool"
-                ])
-            elif 'No such file or directory' in pattern_info['pattern']:
-                fixes.extend([
-                    "Check file path spelling",
-                    "Verify file exists in current directory",
-                    "Use absolute path instead of relative path"
-                ])
-        
-        elif category == ErrorCategory.SYSTEM_ERROR:
-            if 'Permission denied' in pattern_info['pattern']:
-                fixes.extend([
-                    "Run with sudo if system operation required",
-                    "Change file permissions: chmod +x filename",
-                    "Check file ownership: chown user:group filename"
-                ])
-            elif 'Port' in pattern_info['pattern'] and 'in use' in pattern_info['pattern']:
-                fixes.extend([
-                    "Kill process using port: lsof -ti:PORT | xargs kill -9",
-                    "Use different port number",
-                    "Check for running services"
-                ])
-        
-        # Generic fixes if no specific ones found
-        if not fixes:
-            fixes = [
-                "Check command syntax and arguments",
-                "Verify all dependencies are installed",
-                "Review error message for specific guidance"
-            ]
-        
-        return fixes
+        return list(self._fix_generators.get(pattern_id, self._default_fixes)(context))
+    
+    def _module_not_found_fixes(self, context: ErrorContext) -> Tuple[str, ...]:
+        """Suggest fixes for a missing Python module."""
+        module_match = re.search(r"No module named ['\"](.+?)['\"]", context.stderr)
+        if not module_match:
+            return _GENERIC_FIXES
+        
+        module_name = module_match.group(1)
+        return (
+            f"Install missing module: pip install {module_name}",
+            "Check if module is in requirements.txt",
+            "Verify virtual environment is activated"
+        )
+    
+    def _default_fixes(self, context: ErrorContext) -> Tuple[str, ...]:
+        """Generic fixes used when no pattern-specific ones exist."""
+        return _GENERIC_FIXES
     
     def _create_unknown_analysis(self, context: ErrorContext) -> ErrorAnalysis:
         """Create analysis for unknown/unclassified errors."""
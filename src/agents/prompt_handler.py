@@ -19,15 +19,35 @@ Author: Claude Code Assistant
 Date: 2025-01-26
 """
 
+import functools
 import json
 import logging
 import re
-from typing import Dict, Any, List, Tuple, Optional
-from dataclasses import dataclass, asdict
+import sys
+import types
+from bisect import bisect_right
+from collections import OrderedDict
+from typing import Dict, Any, Iterable, List, Set, Tuple, Optional
+from dataclasses import dataclass, fields
 from enum import Enum
 
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+try:
+    import regex
+    REGEX_AVAILABLE = True
+except ImportError:
+    REGEX_AVAILABLE = False
+
 from .confirmation_system import RiskLevel
 
+# Shared by all handler instances; keeps the historical class-named logger
+_LOGGER = logging.getLogger('EnhancedPromptHandler')
+
 
 class RequestType(Enum):
     """Types of user requests."""
@@ -46,7 +66,43 @@ class DisambiguationStrategy(Enum):
     SAFE_DEFAULT = "safe_default"       # Choose safest interpretation
 
 
-@dataclass
+@functools.lru_cache(maxsize=None)
+def _field_names(cls: type) -> Tuple[str, ...]:
+    """Field names of a dataclass type, computed once per class."""
+    return tuple(f.name for f in fields(cls))
+
+
+def _shallow_asdict(dc: Any) -> Dict[str, Any]:
+    """
+    Convert a dataclass to a dict that shares its field values.
+    
+    Unlike dataclasses.asdict, nested lists and dicts (such as
+    IntentDecomposition.intent_dependencies) are not copied.
+    """
+    return {name: getattr(dc, name) for name in _field_names(type(dc))}
+
+
+def _copy_analysis(value: Any) -> Any:
+    """
+    Copy the dict and list containers of an analysis result.
+    
+    Leaves (strings, enums and frozen suggestion dataclasses) are immutable
+    and shared, so this is cheaper than copy.deepcopy while still keeping
+    callers from mutating a cached result through its nested containers.
+    """
+    if isinstance(value, dict):
+        return {key: _copy_analysis(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copy_analysis(item) for item in value]
+    return value
+
+
+# Interned enum values for log and serialization sites
+_REQTYPE_VALUES = types.MappingProxyType({t: sys.intern(t.value) for t in RequestType})
+_STRATEGY_VALUES = types.MappingProxyType({d: sys.intern(d.value) for d in DisambiguationStrategy})
+
+
+@dataclass(slots=True)
 class IntentDecomposition:
     """Result of breaking down a complex request into atomic intents."""
     original_request: str
@@ -55,9 +111,13 @@ class IntentDecomposition:
     risk_assessment: Dict[str, str]  # Risk level for each intent
     execution_order: List[str]
     warnings: List[str]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a flat dictionary without recursively copying field values."""
+        return _shallow_asdict(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class ContextInference:
     """Result of inferring context from ambiguous requests."""
     inferred_context: Dict[str, Any]
@@ -65,9 +125,26 @@ class ContextInference:
     context_sources: List[str]  # What clues led to this inference
     alternatives: List[Dict[str, Any]]  # Alternative interpretations
     needs_clarification: bool
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a flat dictionary without recursively copying field values."""
+        return _shallow_asdict(self)
 
 
-@dataclass
+@dataclass(frozen=True)
+class RequestFeatures:
+    """Keyword and structure features extracted once per request."""
+    request_lower: str
+    word_count: int
+    compound_hits: int
+    ambiguous_hits: int
+    risk_hits: frozenset
+    safety_mask: int
+    context_hits: frozenset
+    partial_hits: frozenset
+
+
+@dataclass(frozen=True, slots=True)
 class CommandSuggestion:
     """A suggested command completion or interpretation."""
     suggested_command: str
@@ -76,6 +153,196 @@ class CommandSuggestion:
     risk_level: RiskLevel
     requires_confirmation: bool
     metadata: Dict[str, Any] = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a flat dictionary without recursively copying field values."""
+        return _shallow_asdict(self)
+
+
+# Risk level lookups used while building suggestions
+_RISK_STR_TO_ENUM = types.MappingProxyType({r.value: r for r in RiskLevel})
+_CONFIRM_LEVELS = frozenset({RiskLevel.MEDIUM, RiskLevel.HIGH, RiskLevel.MAXIMUM})
+_HIGH_RISK_LABELS = frozenset({'high', 'maximum'})
+
+# Canonical clarification for empty or whitespace-only requests
+_EMPTY_CLARIFICATION_MESSAGE = "The request is empty. Please describe what you want to do:"
+_EMPTY_CLARIFICATION_QUESTIONS = (
+    'What specific action do you want to perform?',
+    'Which files or directories are involved?',
+    'What is the expected result?'
+)
+_EMPTY_EXAMPLE_ALTERNATIVES = (
+    'list all Python files',
+    'delete temporary files',
+    'start the development server',
+    'run the test suite'
+)
+
+
+def _empty_clarification() -> Dict[str, Any]:
+    """Build a fresh clarification prompt for an empty request."""
+    return {
+        'type': 'disambiguation',
+        'message': _EMPTY_CLARIFICATION_MESSAGE,
+        'clarification_questions': list(_EMPTY_CLARIFICATION_QUESTIONS),
+        'example_alternatives': list(_EMPTY_EXAMPLE_ALTERNATIVES)
+    }
+
+
+# Direct request -> command mappings for simple commands
+_COMMAND_MAPPINGS = types.MappingProxyType({
+    'list files': 'ls -la',
+    'show files': 'ls -la',
+    'current directory': 'pwd',
+    'git status': 'git status',
+    'check status': 'git status --porcelain',
+    'show branches': 'git branch -a',
+    'list processes': 'ps aux'
+})
+
+# Common partial command completions: (partial pattern, ((description, command, risk), ...))
+_PARTIAL_COMPLETIONS = (
+    ('start the', (
+        ('start the development server', 'npm start', RiskLevel.LOW),
+        ('start the Flask server', 'python app.py', RiskLevel.LOW),
+        ('start the database', 'systemctl start postgresql', RiskLevel.MEDIUM)
+    )),
+    ('run the', (
+        ('run the tests', 'npm test', RiskLevel.LOW),
+        ('run the application', 'python main.py', RiskLevel.LOW),
+        ('run the build', 'npm run build', RiskLevel.LOW)
+    )),
+    ('show me', (
+        ('show me the files', 'ls -la', RiskLevel.MINIMAL),
+        ('show me the status', 'git status', RiskLevel.MINIMAL),
+        ('show me the logs', 'tail -f app.log', RiskLevel.MINIMAL)
+    ))
+)
+
+
+# Shared, immutable suggestions for requests that always resolve the same way
+_STATIC_SUGGESTIONS = types.MappingProxyType({
+    request: CommandSuggestion(
+        suggested_command=command,
+        confidence=0.9,
+        rationale=f"Direct mapping for '{request}'",
+        risk_level=RiskLevel.LOW,
+        requires_confirmation=False
+    )
+    for request, command in _COMMAND_MAPPINGS.items()
+})
+_INFERRED_LIST_SUGGESTION = CommandSuggestion(
+    suggested_command='ls -la',
+    confidence=0.7,
+    rationale="Inferred list/show command",
+    risk_level=RiskLevel.MINIMAL,
+    requires_confirmation=False
+)
+_PARTIAL_SUGGESTIONS = tuple(
+    (partial_pattern, tuple(
+        CommandSuggestion(
+            suggested_command=command,
+            confidence=0.8,
+            rationale=f"Completion for '{partial_pattern}': {description}",
+            risk_level=risk_level,
+            requires_confirmation=risk_level in _CONFIRM_LEVELS
+        )
+        for description, command, risk_level in completions
+    ))
+    for partial_pattern, completions in _PARTIAL_COMPLETIONS
+)
+_GENERIC_PARTIAL_SUGGESTIONS = (
+    CommandSuggestion(
+        suggested_command='ls -la',
+        confidence=0.4,
+        rationale="Generic suggestion: list files",
+        risk_level=RiskLevel.MINIMAL,
+        requires_confirmation=False
+    ),
+    CommandSuggestion(
+        suggested_command='git status',
+        confidence=0.4,
+        rationale="Generic suggestion: check git status",
+        risk_level=RiskLevel.MINIMAL,
+        requires_confirmation=False
+    )
+)
+
+# Safety warning categories as bit flags, with the warning each one raises
+_SAFETY_BITS = types.MappingProxyType({'destructive': 1, 'system': 2, 'broad_scope': 4})
+_SAFETY_WARNINGS = (
+    (1, "Request contains potentially destructive operations"),
+    (2, "Request may require system-level privileges"),
+    (4, "Request has broad scope - consider limiting to specific targets")
+)
+
+
+def _score_complexity(word_count: int, compound_hits: int, ambiguous_hits: int) -> float:
+    """Combine integer request features into a complexity score (0.0 to 1.0)."""
+    score = 0.3 if word_count > 10 else (0.1 if word_count > 5 else 0.0)
+    if compound_hits:
+        score += 0.4
+    score += min(ambiguous_hits * 0.1, 0.3)
+    return min(score, 1.0)
+
+
+class _KeywordMatcher:
+    """
+    Multi-keyword substring matcher that scans a text once for every keyword.
+    
+    Each keyword carries one or more (bucket, value) payloads. Uses an
+    Aho-Corasick automaton when pyahocorasick is installed and falls back
+    to a deduplicated substring scan otherwise; both report the same hits.
+    """
+    
+    def __init__(self, entries: Iterable[Tuple[str, Tuple[str, Any]]]):
+        payloads: Dict[str, List[Tuple[str, Any]]] = {}
+        for keyword, payload in entries:
+            payloads.setdefault(keyword, []).append(payload)
+        
+        self._automaton = None
+        self._keyword_items = tuple((keyword, tuple(items)) for keyword, items in payloads.items())
+        
+        if AHOCORASICK_AVAILABLE:
+            self._automaton = ahocorasick.Automaton()
+            for keyword, items in self._keyword_items:
+                self._automaton.add_word(keyword, items)
+            self._automaton.make_automaton()
+    
+    def scan(self, text: str) -> Dict[str, Set[Any]]:
+        """Return the matched payload values of ``text`` grouped by bucket."""
+        hits: Dict[str, Set[Any]] = {}
+        
+        if self._automaton is not None:
+            matches = (items for _, items in self._automaton.iter(text))
+        else:
+            matches = (items for keyword, items in self._keyword_items if keyword in text)
+        
+        for items in matches:
+            for bucket, value in items:
+                hits.setdefault(bucket, set()).add(value)
+        
+        return hits
+    
+    def scan_many(self, texts: List[str]) -> List[Dict[str, Set[Any]]]:
+        """Scan several texts, using one automaton pass over the joined batch when possible."""
+        if self._automaton is None:
+            return [self.scan(text) for text in texts]
+        
+        results: List[Dict[str, Set[Any]]] = [{} for _ in texts]
+        starts = []
+        offset = 0
+        for text in texts:
+            starts.append(offset)
+            offset += len(text) + 1
+        
+        # Keywords never contain NUL, so no match can span two texts
+        for end_index, items in self._automaton.iter('\x00'.join(texts)):
+            hits = results[bisect_right(starts, end_index) - 1]
+            for bucket, value in items:
+                hits.setdefault(bucket, set()).add(value)
+        
+        return results
 
 
 class EnhancedPromptHandler:
@@ -97,10 +364,16 @@ class EnhancedPromptHandler:
         self.model = model
         self.project_context = project_context or {}
         
-        # Patterns for different request types
-        self.compound_patterns = [
-            r'\band\b', r'\bthen\b', r'\bafter\b', r'\bnext\b', r'\balso\b'
-        ]
+        # Precompiled patterns for different request types
+        # Compound connectors: searched to classify requests and split to decompose them
+        self._compound_re = re.compile(r'\b(?:and|then|after|next|also)\b', re.IGNORECASE)
+        
+        # Vague-but-meaningful phrases, matched as substrings in one alternation
+        self.contextual_terms = ['clean up', 'fix', 'setup', 'prepare', 'organize']
+        phrase_backend = regex if REGEX_AVAILABLE else re
+        self._contextual_term_re = phrase_backend.compile(
+            '|'.join(phrase_backend.escape(term) for term in self.contextual_terms)
+        )
         
         self.contextual_keywords = {
             'cleanup': ['clean', 'cleanup', 'remove unused', 'delete temp'],
@@ -110,14 +383,82 @@ class EnhancedPromptHandler:
             'git': ['commit', 'push', 'pull', 'merge', 'branch']
         }
         
-        self.risk_indicators = {
-            'high_risk': ['delete', 'remove', 'rm', 'clean', 'wipe', 'destroy'],
-            'medium_risk': ['modify', 'change', 'update', 'replace', 'move'],
-            'low_risk': ['list', 'show', 'display', 'find', 'search', 'view']
+        # Canonical risk vocabulary shared by intent risk and safety warnings
+        self._risk_terms: Dict[str, Tuple[str, ...]] = {
+            'high_risk': ('delete', 'remove', 'rm', 'clean', 'wipe', 'destroy'),
+            'medium_risk': ('modify', 'change', 'update', 'replace', 'move'),
+            'low_risk': ('list', 'show', 'display', 'find', 'search', 'view')
+        }
+        
+        self.safety_keywords = {
+            'destructive': [*self._risk_terms['high_risk'], 'kill'],
+            'system': ['sudo', 'admin', 'root', 'system', 'service'],
+            'broad_scope': ['all', 'everything', 'entire', 'whole']
         }
         
-        self.logger = logging.getLogger(f'{self.__class__.__name__}')
-        self.logger.setLevel(logging.INFO)
+        self.ambiguous_words = ['it', 'this', 'that', 'them', 'those', 'the usual']
+        
+        # Inverted index of contextual keywords, in declaration order
+        self._keyword_to_context: Dict[str, str] = {
+            keyword: context_type
+            for context_type, keywords in self.contextual_keywords.items()
+            for keyword in keywords
+        }
+        
+        # One matcher covering every keyword list, scanned once per text
+        self._keyword_matcher = _KeywordMatcher(self._keyword_entries())
+        
+        # Per-request feature extraction, memoized so helpers share one keyword pass
+        self._extract_features = functools.lru_cache(maxsize=256)(self._compute_features)
+        
+        # LRU cache of analysis results keyed by (request, project context contents);
+        # keying on the rendered context keeps in-place context edits from serving stale results
+        self._exact_cache: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        self._exact_cache_maxsize = 512
+        
+        self.logger = _LOGGER
+    
+    def _keyword_entries(self) -> List[Tuple[str, Tuple[str, Any]]]:
+        """Tag every keyword with the (bucket, value) it contributes when matched."""
+        entries = []
+        
+        # Context hits carry their declaration rank so sorting them restores keyword order
+        for rank, keyword in enumerate(self._keyword_to_context):
+            entries.append((keyword, ('context', (rank, keyword))))
+        
+        for risk_level, terms in self._risk_terms.items():
+            entries.extend((term, ('risk', risk_level)) for term in terms)
+        
+        for safety_type, keywords in self.safety_keywords.items():
+            entries.extend((keyword, ('safety', _SAFETY_BITS[safety_type])) for keyword in keywords)
+        
+        entries.extend((word, ('ambiguous', word)) for word in self.ambiguous_words)
+        
+        entries.extend((pattern, ('partial', pattern)) for pattern, _ in _PARTIAL_COMPLETIONS)
+        
+        return entries
+    
+    def _compute_features(self, request: str) -> RequestFeatures:
+        """Scan a request once and collect the features used by the analysis helpers."""
+        request_lower = request.lower().strip()
+        return self._build_features(request_lower, self._keyword_matcher.scan(request_lower))
+    
+    def _build_features(self, request_lower: str, hits: Dict[str, Set[Any]]) -> RequestFeatures:
+        """Assemble RequestFeatures from a normalized request and its keyword hits."""
+        safety_mask = 0
+        for bit in hits.get('safety', ()):
+            safety_mask |= bit
+        
+        return RequestFeatures(
+            request_lower=request_lower,
+            word_count=len(request_lower.split()),
+            compound_hits=1 if self._compound_re.search(request_lower) else 0,
+            ambiguous_hits=len(hits.get('ambiguous', ())),
+            risk_hits=frozenset(hits.get('risk', ())),
+            safety_mask=safety_mask,
+            context_hits=frozenset(hits.get('context', ())),
+            partial_hits=frozenset(hits.get('partial', ()))
+        )
     
     def analyze_request(self, request: str) -> Dict[str, Any]:
         """
@@ -129,10 +470,96 @@ class EnhancedPromptHandler:
         Returns:
             Analysis result with request type, strategy, and recommendations
         """
+        if not request or request.isspace():
+            return self._empty_analysis(request)
+        
+        cache_key = (request, str(self.project_context))
+        
+        cached = self._cache_lookup(cache_key)
+        if cached is not None:
+            return cached
+        
+        return self._cache_store(cache_key, self._analyze_uncached(request, self._extract_features(request)))
+    
+    def analyze_requests(self, requests: List[str]) -> List[Dict[str, Any]]:
+        """
+        Analyze a batch of user requests, sharing one keyword pass across the batch.
+        
+        Args:
+            requests: The user's natural language requests
+            
+        Returns:
+            One analysis result per request, in input order
+        """
+        context_key = str(self.project_context)
+        results: List[Optional[Dict[str, Any]]] = [None] * len(requests)
+        pending = []
+        
+        for index, request in enumerate(requests):
+            if not request or request.isspace():
+                results[index] = self._empty_analysis(request)
+                continue
+            
+            cached = self._cache_lookup((request, context_key))
+            if cached is not None:
+                results[index] = cached
+            else:
+                pending.append(index)
+        
+        if pending:
+            lowered = [requests[index].lower().strip() for index in pending]
+            batch_hits = self._keyword_matcher.scan_many(lowered)
+            
+            for index, request_lower, hits in zip(pending, lowered, batch_hits):
+                request = requests[index]
+                cache_key = (request, context_key)
+                # Duplicates within the batch are served from the entry stored by the first one
+                cached = self._cache_lookup(cache_key)
+                if cached is not None:
+                    results[index] = cached
+                    continue
+                
+                features = self._build_features(request_lower, hits)
+                results[index] = self._cache_store(cache_key, self._analyze_uncached(request, features))
+        
+        return results
+    
+    def _empty_analysis(self, request: str) -> Dict[str, Any]:
+        """Return the canonical analysis for an empty or whitespace-only request."""
+        return {
+            'original_request': request,
+            'request_type': RequestType.AMBIGUOUS_REQUEST,
+            'complexity_score': 0.0,
+            'disambiguation_strategy': DisambiguationStrategy.REQUEST_CLARIFICATION,
+            'recommendations': [_empty_clarification()],
+            'warnings': [],
+            'metadata': {},
+            'clarification_options': [_empty_clarification()]
+        }
+    
+    def _cache_lookup(self, cache_key: Tuple[str, str]) -> Optional[Dict[str, Any]]:
+        """Return a copy of a cached analysis, refreshing its LRU position."""
+        cached = self._exact_cache.get(cache_key)
+        if cached is None:
+            return None
+        
+        self._exact_cache.move_to_end(cache_key)
+        return _copy_analysis(cached)
+    
+    def _cache_store(self, cache_key: Tuple[str, str], analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """Cache an analysis, evicting the least recently used entry, and return a copy."""
+        self._exact_cache[cache_key] = analysis
+        if len(self._exact_cache) > self._exact_cache_maxsize:
+            self._exact_cache.popitem(last=False)
+        
+        return _copy_analysis(analysis)
+    
+    def _analyze_uncached(self, request: str, features: RequestFeatures) -> Dict[str, Any]:
+        """Run the full analysis pipeline for a request."""
         analysis = {
             'original_request': request,
-            'request_type': self._classify_request_type(request),
-            'complexity_score': self._assess_complexity(request),
+            'request_type': self._classify_request_type(features),
+            'complexity_score': self._assess_complexity(features),
             'disambiguation_strategy': None,
             'recommendations': [],
             'warnings': [],
@@ -142,20 +569,20 @@ class EnhancedPromptHandler:
         # Determine appropriate handling strategy
         request_type = analysis['request_type']
         
-        if request_type == RequestType.SIMPLE_COMMAND:
+        if request_type is RequestType.SIMPLE_COMMAND:
             analysis['disambiguation_strategy'] = DisambiguationStrategy.AUTO_INFER
-            analysis['recommendations'] = [self._handle_simple_command(request)]
+            analysis['recommendations'] = [self._handle_simple_command(request, features)]
             
-        elif request_type == RequestType.COMPOUND_REQUEST:
+        elif request_type is RequestType.COMPOUND_REQUEST:
             analysis['disambiguation_strategy'] = DisambiguationStrategy.SUGGEST_OPTIONS
             decomposition = self._decompose_compound_request(request)
-            analysis['intent_decomposition'] = asdict(decomposition)
+            analysis['intent_decomposition'] = decomposition.to_dict()
             analysis['recommendations'] = self._generate_compound_recommendations(decomposition)
             
-        elif request_type == RequestType.CONTEXTUAL_REQUEST:
+        elif request_type is RequestType.CONTEXTUAL_REQUEST:
             analysis['disambiguation_strategy'] = DisambiguationStrategy.AUTO_INFER
-            inference = self._infer_context(request)
-            analysis['context_inference'] = asdict(inference)
+            inference = self._infer_context(features)
+            analysis['context_inference'] = inference.to_dict()
             
             if inference.needs_clarification:
                 analysis['disambiguation_strategy'] = DisambiguationStrategy.REQUEST_CLARIFICATION
@@ -163,31 +590,36 @@ class EnhancedPromptHandler:
             else:
                 analysis['recommendations'] = self._generate_contextual_recommendations(inference)
                 
-        elif request_type == RequestType.PARTIAL_COMMAND:
+        elif request_type is RequestType.PARTIAL_COMMAND:
             analysis['disambiguation_strategy'] = DisambiguationStrategy.SUGGEST_OPTIONS
-            suggestions = self._complete_partial_command(request)
-            analysis['command_suggestions'] = [asdict(s) for s in suggestions]
+            suggestions = self._complete_partial_command(features)
+            analysis['command_suggestions'] = [s.to_dict() for s in suggestions]
             analysis['recommendations'] = suggestions
             
-        elif request_type == RequestType.AMBIGUOUS_REQUEST:
+        elif request_type is RequestType.AMBIGUOUS_REQUEST:
             analysis['disambiguation_strategy'] = DisambiguationStrategy.REQUEST_CLARIFICATION
             clarifications = self._generate_ambiguity_clarifications(request)
             analysis['clarification_options'] = clarifications
             analysis['recommendations'] = clarifications
         
         # Add safety warnings
-        analysis['warnings'].extend(self._assess_safety_risks(request))
+        analysis['warnings'].extend(self._assess_safety_risks(features))
         
-        self.logger.info(f"Request analyzed: {request_type.value} - {analysis['disambiguation_strategy'].value}")
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info(
+                "Request analyzed: %s - %s",
+                _REQTYPE_VALUES[request_type],
+                _STRATEGY_VALUES[analysis['disambiguation_strategy']]
+            )
         
         return analysis
     
-    def _classify_request_type(self, request: str) -> RequestType:
+    def _classify_request_type(self, features: RequestFeatures) -> RequestType:
         """Classify the type of user request."""
-        request_lower = request.lower().strip()
+        request_lower = features.request_lower
         
         # Check for compound requests (multiple actions)
-        if any(re.search(pattern, request_lower) for pattern in self.compound_patterns):
+        if features.compound_hits:
             return RequestType.COMPOUND_REQUEST
         
         # Check for partial/incomplete commands
@@ -195,74 +627,32 @@ class EnhancedPromptHandler:
             return RequestType.PARTIAL_COMMAND
         
         # Check for contextual requests (vague but contextually meaningful)
-        contextual_terms = ['clean up', 'fix', 'setup', 'prepare', 'organize']
-        if any(term in request_lower for term in contextual_terms):
+        if self._contextual_term_re.search(request_lower) is not None:
             return RequestType.CONTEXTUAL_REQUEST
         
         # Check for ambiguous requests (too vague to interpret)
-        if len(request_lower.split()) <= 2 and not any(keyword in request_lower for keywords in self.contextual_keywords.values() for keyword in keywords):
+        if features.word_count <= 2 and not features.context_hits:
             return RequestType.AMBIGUOUS_REQUEST
         
         # Default to simple command
         return RequestType.SIMPLE_COMMAND
     
-    def _assess_complexity(self, request: str) -> float:
+    def _assess_complexity(self, features: RequestFeatures) -> float:
         """Assess the complexity of a request (0.0 to 1.0)."""
-        complexity_factors = 0.0
-        
-        # Length factor
-        word_count = len(request.split())
-        if word_count > 10:
-            complexity_factors += 0.3
-        elif word_count > 5:
-            complexity_factors += 0.1
-        
-        # Compound structure
-        if any(re.search(pattern, request.lower()) for pattern in self.compound_patterns):
-            complexity_factors += 0.4
-        
-        # Ambiguous references
-        ambiguous_words = ['it', 'this', 'that', 'them', 'those', 'the usual']
-        ambiguous_count = sum(1 for word in ambiguous_words if word in request.lower())
-        complexity_factors += min(ambiguous_count * 0.1, 0.3)
-        
-        return min(complexity_factors, 1.0)
+        return _score_complexity(features.word_count, features.compound_hits, features.ambiguous_hits)
     
-    def _handle_simple_command(self, request: str) -> CommandSuggestion:
+    def _handle_simple_command(self, request: str, features: RequestFeatures) -> CommandSuggestion:
         """Handle a simple, straightforward command request."""
-        # Simple command mapping
-        command_mappings = {
-            'list files': 'ls -la',
-            'show files': 'ls -la',
-            'current directory': 'pwd',
-            'git status': 'git status',
-            'check status': 'git status --porcelain',
-            'show branches': 'git branch -a',
-            'list processes': 'ps aux'
-        }
-        
-        request_lower = request.lower().strip()
+        request_lower = features.request_lower
         
         # Direct mapping
-        if request_lower in command_mappings:
-            command = command_mappings[request_lower]
-            return CommandSuggestion(
-                suggested_command=command,
-                confidence=0.9,
-                rationale=f"Direct mapping for '{request}'",
-                risk_level=RiskLevel.LOW,
-                requires_confirmation=False
-            )
+        suggestion = _STATIC_SUGGESTIONS.get(request_lower)
+        if suggestion is not None:
+            return suggestion
         
         # Pattern-based inference
         if 'list' in request_lower or 'show' in request_lower:
-            return CommandSuggestion(
-                suggested_command='ls -la',
-                confidence=0.7,
-                rationale="Inferred list/show command",
-                risk_level=RiskLevel.MINIMAL,
-                requires_confirmation=False
-            )
+            return _INFERRED_LIST_SUGGESTION
         
         # Fallback
         return CommandSuggestion(
@@ -275,20 +665,14 @@ class EnhancedPromptHandler:
     
     def _decompose_compound_request(self, request: str) -> IntentDecomposition:
         """Decompose a compound request into atomic intents."""
-        # Split by compound indicators
-        parts = re.split(r'\\b(and|then|after|next|also)\\b', request, flags=re.IGNORECASE)
-        
-        # Filter out connecting words and clean up parts
-        atomic_intents = []
-        for part in parts:
-            part = part.strip()
-            if part and part.lower() not in ['and', 'then', 'after', 'next', 'also']:
-                atomic_intents.append(part)
+        # Split by compound indicators (non-capturing, so connectors are dropped)
+        parts = self._compound_re.split(request)
+        atomic_intents = [part.strip() for part in parts if part.strip()]
         
         # Assess risk for each intent
         risk_assessment = {}
         for intent in atomic_intents:
-            risk_assessment[intent] = self._assess_intent_risk(intent)
+            risk_assessment[intent] = self._assess_intent_risk(self._extract_features(intent))
         
         # Determine execution order (simple sequential for now)
         execution_order = atomic_intents.copy()
@@ -306,7 +690,7 @@ class EnhancedPromptHandler:
         if len(atomic_intents) > 3:
             warnings.append("Complex compound request with multiple steps")
         
-        high_risk_intents = [intent for intent, risk in risk_assessment.items() if risk in ['high', 'maximum']]
+        high_risk_intents = [intent for intent, risk in risk_assessment.items() if risk in _HIGH_RISK_LABELS]
         if high_risk_intents:
             warnings.append(f"High-risk operations detected: {', '.join(high_risk_intents)}")
         
@@ -319,31 +703,28 @@ class EnhancedPromptHandler:
             warnings=warnings
         )
     
-    def _assess_intent_risk(self, intent: str) -> str:
+    def _assess_intent_risk(self, features: RequestFeatures) -> str:
         """Assess the risk level of a single intent."""
-        intent_lower = intent.lower()
-        
-        for risk_level, indicators in self.risk_indicators.items():
-            if any(indicator in intent_lower for indicator in indicators):
+        for risk_level in self._risk_terms:
+            if risk_level in features.risk_hits:
                 return risk_level.replace('_risk', '')
         
         return 'low'
     
-    def _infer_context(self, request: str) -> ContextInference:
+    def _infer_context(self, features: RequestFeatures) -> ContextInference:
         """Infer context from a contextual request."""
-        request_lower = request.lower()
+        request_lower = features.request_lower
         inferred_context = {}
         context_sources = []
         confidence_score = 0.0
         alternatives = []
         
         # Check against contextual keywords
-        for context_type, keywords in self.contextual_keywords.items():
-            for keyword in keywords:
-                if keyword in request_lower:
-                    inferred_context[context_type] = True
-                    context_sources.append(f"Keyword '{keyword}' suggests {context_type}")
-                    confidence_score += 0.2
+        for _, keyword in sorted(features.context_hits):
+            context_type = self._keyword_to_context[keyword]
+            inferred_context[context_type] = True
+            context_sources.append(f"Keyword '{keyword}' suggests {context_type}")
+            confidence_score += 0.2
         
         # Project context inference
         if self.project_context:
@@ -379,60 +760,19 @@ class EnhancedPromptHandler:
             needs_clarification=needs_clarification
         )
     
-    def _complete_partial_command(self, request: str) -> List[CommandSuggestion]:
+    def _complete_partial_command(self, features: RequestFeatures) -> List[CommandSuggestion]:
         """Complete a partial command based on context and common patterns."""
-        request_lower = request.lower().strip()
+        partial_hits = features.partial_hits
         suggestions = []
         
-        # Common partial command completions
-        partial_completions = {
-            'start the': [
-                ('start the development server', 'npm start', RiskLevel.LOW),
-                ('start the Flask server', 'python app.py', RiskLevel.LOW),
-                ('start the database', 'systemctl start postgresql', RiskLevel.MEDIUM)
-            ],
-            'run the': [
-                ('run the tests', 'npm test', RiskLevel.LOW),
-                ('run the application', 'python main.py', RiskLevel.LOW),
-                ('run the build', 'npm run build', RiskLevel.LOW)
-            ],
-            'show me': [
-                ('show me the files', 'ls -la', RiskLevel.MINIMAL),
-                ('show me the status', 'git status', RiskLevel.MINIMAL),
-                ('show me the logs', 'tail -f app.log', RiskLevel.MINIMAL)
-            ]
-        }
-        
         # Find matching partial patterns
-        for partial_pattern, completions in partial_completions.items():
-            if partial_pattern in request_lower:
-                for description, command, risk_level in completions:
-                    suggestions.append(CommandSuggestion(
-                        suggested_command=command,
-                        confidence=0.8,
-                        rationale=f"Completion for '{partial_pattern}': {description}",
-                        risk_level=risk_level,
-                        requires_confirmation=risk_level in [RiskLevel.MEDIUM, RiskLevel.HIGH, RiskLevel.MAXIMUM]
-                    ))
+        for partial_pattern, completions in _PARTIAL_SUGGESTIONS:
+            if partial_pattern in partial_hits:
+                suggestions.extend(completions)
         
         # If no direct matches, provide generic suggestions
         if not suggestions:
-            suggestions = [
-                CommandSuggestion(
-                    suggested_command='ls -la',
-                    confidence=0.4,
-                    rationale="Generic suggestion: list files",
-                    risk_level=RiskLevel.MINIMAL,
-                    requires_confirmation=False
-                ),
-                CommandSuggestion(
-                    suggested_command='git status',
-                    confidence=0.4,
-                    rationale="Generic suggestion: check git status",
-                    risk_level=RiskLevel.MINIMAL,
-                    requires_confirmation=False
-                )
-            ]
+            suggestions = list(_GENERIC_PARTIAL_SUGGESTIONS)
         
         return suggestions[:5]  # Limit to top 5 suggestions
     
@@ -447,7 +787,7 @@ class EnhancedPromptHandler:
                 'step': len(recommendations) + 1,
                 'intent': intent,
                 'risk_level': risk_level,
-                'requires_confirmation': risk_level in ['high', 'maximum'],
+                'requires_confirmation': risk_level in _HIGH_RISK_LABELS,
                 'dependencies': decomposition.intent_dependencies.get(intent, [])
             })
         
@@ -479,13 +819,13 @@ class EnhancedPromptHandler:
         
         # Add alternatives as additional suggestions
         for alt in inference.alternatives:
-            risk_level = RiskLevel(alt['risk'].lower()) if alt['risk'].lower() in [r.value for r in RiskLevel] else RiskLevel.MEDIUM
+            risk_level = _RISK_STR_TO_ENUM.get(alt['risk'].lower(), RiskLevel.MEDIUM)
             suggestions.append(CommandSuggestion(
                 suggested_command=alt['command'],
                 confidence=0.6,
                 rationale=f"Alternative interpretation: {alt['action']}",
                 risk_level=risk_level,
-                requires_confirmation=risk_level in [RiskLevel.MEDIUM, RiskLevel.HIGH, RiskLevel.MAXIMUM]
+                requires_confirmation=risk_level in _CONFIRM_LEVELS
             ))
         
         return suggestions
@@ -542,27 +882,10 @@ class EnhancedPromptHandler:
             ]
         }]
     
-    def _assess_safety_risks(self, request: str) -> List[str]:
+    def _assess_safety_risks(self, features: RequestFeatures) -> List[str]:
         """Assess potential safety risks in the request."""
-        warnings = []
-        request_lower = request.lower()
-        
-        # Check for destructive operations
-        destructive_keywords = ['delete', 'remove', 'rm', 'clean', 'wipe', 'destroy', 'kill']
-        if any(keyword in request_lower for keyword in destructive_keywords):
-            warnings.append("Request contains potentially destructive operations")
-        
-        # Check for system-level operations
-        system_keywords = ['sudo', 'admin', 'root', 'system', 'service']
-        if any(keyword in request_lower for keyword in system_keywords):
-            warnings.append("Request may require system-level privileges")
-        
-        # Check for broad scope operations
-        broad_scope_keywords = ['all', 'everything', 'entire', 'whole']
-        if any(keyword in request_lower for keyword in broad_scope_keywords):
-            warnings.append("Request has broad scope - consider limiting to specific targets")
-        
-        return warnings
+        mask = features.safety_mask
+        return [warning for bit, warning in _SAFETY_WARNINGS if mask & bit]
 
 
 # Convenience function
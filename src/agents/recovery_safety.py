@@ -17,16 +17,42 @@ Author: Claude Code Assistant
 Date: 2025-01-26
 """
 
+import array
+import asyncio
+import functools
+import itertools
 import json
 import logging
 import os
 import threading
 import time
 from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional, Set, Callable
+from typing import Dict, Any, List, Optional, Set, Callable, Tuple
 from dataclasses import dataclass, asdict
 from enum import Enum
-from collections import defaultdict, deque
+from collections import deque
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+
+if ORJSON_AVAILABLE:
+    def _encode_audit_record(record: Dict[str, Any]) -> bytes:
+        """Encode an audit record as compact JSON bytes."""
+        return orjson.dumps(record, option=orjson.OPT_NON_STR_KEYS)
+else:
+    def _encode_audit_record(record: Dict[str, Any]) -> bytes:
+        """Encode an audit record as compact JSON bytes."""
+        return json.dumps(record).encode('utf-8')
 
 
 class SafetyLevel(Enum):
@@ -47,6 +73,7 @@ class AuditEventType(Enum):
     RISKY_OPERATION_BLOCKED = "risky_operation_blocked"
     RESOURCE_LIMIT_EXCEEDED = "resource_limit_exceeded"
     MANUAL_INTERVENTION_REQUIRED = "manual_intervention_required"
+    RECOVERY_BATCH_STARTED = "recovery_batch_started"
 
 
 @dataclass
@@ -62,9 +89,12 @@ class SafetyLimits:
     max_disk_space_usage_mb: int = 100
     circuit_breaker_failure_threshold: int = 5
     circuit_breaker_timeout_seconds: int = 300  # 5 minutes
+    # Lowest safety level ("safe", "cautious", "restricted") whose grants emit
+    # a RECOVERY_STARTED audit event; high-risk operations are always audited
+    audit_started_events_only_when: str = "safe"
 
 
-@dataclass
+@dataclass(slots=True)
 class AuditEvent:
     """Structured audit event."""
     event_id: str
@@ -88,6 +118,44 @@ class AuditEvent:
             'risk_level': self.risk_level,
             'resource_usage': self.resource_usage
         }
+    
+    def encode(self) -> bytes:
+        """Encode as a JSON object using the precomputed type/risk prefix."""
+        fields = _encode_audit_record({
+            'event_id': self.event_id,
+            'timestamp': self.timestamp.isoformat(),
+            'session_id': self.session_id,
+            'user_id': self.user_id,
+            'details': self.details,
+            'resource_usage': self.resource_usage
+        })
+        return _audit_template(self.event_type, self.risk_level) + fields[1:]
+
+
+# Encoded '{"event_type":...,"risk_level":...,' prefixes per (event type, risk level)
+_AUDIT_TEMPLATES: Dict[Tuple[AuditEventType, str], bytes] = {}
+
+
+def _audit_template(event_type: AuditEventType, risk_level: str) -> bytes:
+    """Get the encoded JSON prefix holding an event's constant fields."""
+    key = (event_type, risk_level)
+    template = _AUDIT_TEMPLATES.get(key)
+    if template is None:
+        encoded = _encode_audit_record({'event_type': event_type.value, 'risk_level': risk_level})
+        template = encoded[:-1] + b','
+        if len(_AUDIT_TEMPLATES) < 256:
+            _AUDIT_TEMPLATES[key] = template
+    return template
+
+
+for _event_type in AuditEventType:
+    for _risk_level in ('low', 'medium', 'high', 'critical', 'maximum'):
+        _audit_template(_event_type, _risk_level)
+
+
+# Shared result for ResourceUsage.exceeds_limits when nothing is exceeded;
+# callers only truth-test it and must not mutate it
+_NO_VIOLATIONS: List[Tuple[str, float, float]] = []
 
 
 @dataclass
@@ -100,28 +168,142 @@ class ResourceUsage:
     total_recovery_time_hour: float
     code_modifications_hour: int
     
-    def exceeds_limits(self, limits: SafetyLimits) -> List[str]:
-        """Check which limits are exceeded."""
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for serialization."""
+        return {
+            'memory_usage_mb': self.memory_usage_mb,
+            'disk_usage_mb': self.disk_usage_mb,
+            'cpu_percent': self.cpu_percent,
+            'active_recoveries': self.active_recoveries,
+            'total_recovery_time_hour': self.total_recovery_time_hour,
+            'code_modifications_hour': self.code_modifications_hour
+        }
+    
+    def exceeds_limits(self, limits: SafetyLimits) -> List[Tuple[str, float, float]]:
+        """
+        Check which limits are exceeded.
+        
+        Returns:
+            (code, usage, limit) tuples; see _format_violations for messages
+        """
+        # Fast path: nothing exceeded, no new list
+        if not (self.memory_usage_mb > limits.max_memory_usage_mb
+                or self.disk_usage_mb > limits.max_disk_space_usage_mb
+                or self.active_recoveries > limits.max_concurrent_recoveries
+                or self.total_recovery_time_hour > limits.max_total_recovery_time_per_hour
+                or self.code_modifications_hour > limits.max_code_modifications_per_hour):
+            return _NO_VIOLATIONS
+        
         violations = []
         
         if self.memory_usage_mb > limits.max_memory_usage_mb:
-            violations.append(f"Memory usage: {self.memory_usage_mb:.1f}MB > {limits.max_memory_usage_mb}MB")
+            violations.append(('memory', self.memory_usage_mb, limits.max_memory_usage_mb))
         
         if self.disk_usage_mb > limits.max_disk_space_usage_mb:
-            violations.append(f"Disk usage: {self.disk_usage_mb:.1f}MB > {limits.max_disk_space_usage_mb}MB")
+            violations.append(('disk', self.disk_usage_mb, limits.max_disk_space_usage_mb))
         
         if self.active_recoveries > limits.max_concurrent_recoveries:
-            violations.append(f"Active recoveries: {self.active_recoveries} > {limits.max_concurrent_recoveries}")
+            violations.append(('active_recoveries', self.active_recoveries, limits.max_concurrent_recoveries))
         
         if self.total_recovery_time_hour > limits.max_total_recovery_time_per_hour:
-            violations.append(f"Recovery time/hour: {self.total_recovery_time_hour:.1f}s > {limits.max_total_recovery_time_per_hour}s")
+            violations.append(('recovery_time_hour', self.total_recovery_time_hour, limits.max_total_recovery_time_per_hour))
         
         if self.code_modifications_hour > limits.max_code_modifications_per_hour:
-            violations.append(f"Code modifications/hour: {self.code_modifications_hour} > {limits.max_code_modifications_per_hour}")
+            violations.append(('code_modifications_hour', self.code_modifications_hour, limits.max_code_modifications_per_hour))
         
         return violations
 
 
+# Message templates for ResourceUsage.exceeds_limits violation codes
+_VIOLATION_FORMATS = {
+    'memory': "Memory usage: {0:.1f}MB > {1}MB",
+    'disk': "Disk usage: {0:.1f}MB > {1}MB",
+    'active_recoveries': "Active recoveries: {0} > {1}",
+    'recovery_time_hour': "Recovery time/hour: {0:.1f}s > {1}s",
+    'code_modifications_hour': "Code modifications/hour: {0} > {1}"
+}
+
+
+def _format_violations(violations: List[Tuple[str, float, float]]) -> List[str]:
+    """Format violation tuples from exceeds_limits as readable messages."""
+    return [_VIOLATION_FORMATS[code].format(usage, limit) for code, usage, limit in violations]
+
+
+# Circuit breaker states; a single int so the closed check is one attribute read
+_CLOSED = 0
+_OPEN = 1
+_HALF_OPEN = 2
+_STATE_NAMES = ("closed", "open", "half-open")
+
+
+def _new_hour_slot() -> Dict[str, Any]:
+    """Create an empty hourly stats slot, tagged with the epoch hour it holds."""
+    return {
+        'recovery_attempts': 0,
+        'code_modifications': 0,
+        'total_recovery_time': 0.0,
+        '_epoch_hour': -1
+    }
+
+
+def _hour_stats_view(slot: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy an hourly stats slot without its epoch tag."""
+    return {
+        'recovery_attempts': slot['recovery_attempts'],
+        'code_modifications': slot['code_modifications'],
+        'total_recovery_time': slot['total_recovery_time']
+    }
+
+
+# Conditions attached to an authorization at each safety level
+_SAFETY_CONDITIONS: Dict[SafetyLevel, Tuple[str, ...]] = {
+    SafetyLevel.RESTRICTED: (
+        "Additional confirmation required for risky operations",
+        "Enhanced monitoring and logging active",
+        "Automatic rollback enabled"
+    ),
+    SafetyLevel.CAUTIOUS: (
+        "Increased monitoring active",
+        "Resource usage will be tracked closely"
+    ),
+    SafetyLevel.SAFE: (),
+    SafetyLevel.BLOCKED: ()
+}
+
+# Ordering of safety levels from least to most restrictive
+_SAFETY_RANK = {
+    SafetyLevel.SAFE: 0,
+    SafetyLevel.CAUTIOUS: 1,
+    SafetyLevel.RESTRICTED: 2,
+    SafetyLevel.BLOCKED: 3
+}
+
+# Risk levels whose authorizations are always audited
+_AUDITED_RISK = frozenset({'high', 'critical', 'maximum'})
+
+# Risk levels that always restrict an operation
+_HIGH_RISK = frozenset({'critical', 'maximum'})
+
+
+@functools.lru_cache(maxsize=64)
+def _classify_op(operation_type: str) -> Tuple[str, bool]:
+    """Map an operation type to its circuit breaker key and whether it modifies code."""
+    op = operation_type.lower()
+    is_code = 'code' in op
+    if is_code:
+        return 'code_fix', True
+    if 'command' in op:
+        return 'command_retry', False
+    return 'recovery', False
+
+
+# Number of shards for the active recovery session sets
+_RECOVERY_SHARDS = 16
+
+# Number of recovery completions kept in history
+_HISTORY_SIZE = 1000
+
+
 class CircuitBreaker:
     """Circuit breaker to prevent cascading failures."""
     
@@ -136,49 +318,79 @@ class CircuitBreaker:
         self.failure_threshold = failure_threshold
         self.timeout_seconds = timeout_seconds
         self.failure_count = 0
-        self.last_failure_time = None
-        self.state = "closed"  # closed, open, half-open
+        self.last_failure_time = None  # For status display only
+        self._last_failure_monotonic = 0.0  # For timeout arithmetic
+        self._state = _CLOSED
         self._lock = threading.Lock()
     
+    @property
+    def state(self) -> str:
+        """Current state name: closed, open or half-open."""
+        return _STATE_NAMES[self._state]
+    
     def can_proceed(self) -> bool:
         """Check if operation can proceed through circuit breaker."""
+        # Fast path: closed and half-open never block, no lock needed
+        if self._state != _OPEN:
+            return True
+        
         with self._lock:
-            if self.state == "closed":
+            if self._state != _OPEN:
                 return True
-            elif self.state == "open":
-                if self.last_failure_time and (
-                    datetime.now() - self.last_failure_time
-                ).total_seconds() > self.timeout_seconds:
-                    self.state = "half-open"
-                    return True
-                return False
-            else:  # half-open
+            if self.last_failure_time and (
+                time.monotonic() - self._last_failure_monotonic > self.timeout_seconds
+            ):
+                self._state = _HALF_OPEN
                 return True
+            return False
     
     def record_success(self):
         """Record successful operation."""
+        if self._state == _CLOSED and self.failure_count == 0:
+            return
         with self._lock:
             self.failure_count = 0
-            self.state = "closed"
+            self._state = _CLOSED
     
     def record_failure(self):
         """Record failed operation."""
         with self._lock:
             self.failure_count += 1
             self.last_failure_time = datetime.now()
+            self._last_failure_monotonic = time.monotonic()
             
             if self.failure_count >= self.failure_threshold:
-                self.state = "open"
+                self._state = _OPEN
     
     def get_status(self) -> Dict[str, Any]:
         """Get circuit breaker status."""
         with self._lock:
             return {
-                'state': self.state,
+                'state': _STATE_NAMES[self._state],
                 'failure_count': self.failure_count,
                 'failure_threshold': self.failure_threshold,
                 'last_failure_time': self.last_failure_time.isoformat() if self.last_failure_time else None
             }
+    
+    def snapshot(self) -> Tuple[str, int, int, Optional[datetime]]:
+        """
+        Read state, failure count, threshold and last failure time without locking.
+        
+        Each field is read atomically, but the fields may come from different
+        updates; good enough for monitoring, not for decisions.
+        """
+        return (_STATE_NAMES[self._state], self.failure_count,
+                self.failure_threshold, self.last_failure_time)
+    
+    def get_status_nolock(self) -> Dict[str, Any]:
+        """Get circuit breaker status from a lock-free snapshot."""
+        state, failure_count, failure_threshold, last_failure_time = self.snapshot()
+        return {
+            'state': state,
+            'failure_count': failure_count,
+            'failure_threshold': failure_threshold,
+            'last_failure_time': last_failure_time.isoformat() if last_failure_time else None
+        }
 
 
 class RecoverySafetyManager:
@@ -189,16 +401,27 @@ class RecoverySafetyManager:
     and maintains detailed audit trails for all recovery operations.
     """
     
-    def __init__(self, safety_limits: SafetyLimits = None, audit_log_path: str = None):
+    def __init__(self, safety_limits: SafetyLimits = None, audit_log_path: str = None,
+                 audit_backpressure_mode: str = "drop"):
         """
         Initialize recovery safety manager.
         
         Args:
             safety_limits: Configuration for safety limits
             audit_log_path: Path to audit log file
+            audit_backpressure_mode: What to do when the audit buffer is full:
+                "drop" discards the oldest events, "block" writes the buffer
+                out before queueing more
         """
+        if audit_backpressure_mode not in ("drop", "block"):
+            raise ValueError(f"Unknown audit backpressure mode: {audit_backpressure_mode}")
+        
         self.safety_limits = safety_limits or SafetyLimits()
         self.audit_log_path = audit_log_path or "recovery_audit.jsonl"
+        self.audit_backpressure_mode = audit_backpressure_mode
+        self._min_started_audit_rank = _SAFETY_RANK[
+            SafetyLevel(self.safety_limits.audit_started_events_only_when)
+        ]
         
         # Circuit breakers for different operations
         self.circuit_breakers = {
@@ -209,21 +432,49 @@ class RecoverySafetyManager:
             'code_fix': CircuitBreaker(3, 600),  # 10 minute timeout for code fixes
             'command_retry': CircuitBreaker(5, 180)  # 3 minute timeout for command retries
         }
+        # Breaker refs keyed by every key _classify_op can return
+        self._breaker_map = {
+            'recovery': self.circuit_breakers['recovery'],
+            'code_fix': self.circuit_breakers['code_fix'],
+            'command_retry': self.circuit_breakers['command_retry']
+        }
+        self._recovery_breaker = self.circuit_breakers['recovery']
         
         # Activity tracking
-        self.active_recoveries: Set[str] = set()
-        self.recovery_history = deque(maxlen=1000)  # Keep last 1000 operations
-        self.hourly_stats = defaultdict(lambda: {
-            'recovery_attempts': 0,
-            'code_modifications': 0,
-            'total_recovery_time': 0.0
-        })
+        # Active sessions are sharded by session id so adds/removes touch one
+        # small set; the total is kept as a separate counter
+        self._recovery_shards: List[Set[str]] = [set() for _ in range(_RECOVERY_SHARDS)]
+        self._recovery_shard_locks = [threading.Lock() for _ in range(_RECOVERY_SHARDS)]
+        self._active_count = 0
+        self._active_count_lock = threading.Lock()
+        # Last _HISTORY_SIZE completions as column arrays written at a
+        # wrapping cursor (see the recovery_history property)
+        self._hist_session: List[Optional[str]] = [None] * _HISTORY_SIZE
+        self._hist_ts = array.array('d', bytes(8 * _HISTORY_SIZE))
+        self._hist_success = bytearray(_HISTORY_SIZE)
+        self._hist_time = array.array('d', bytes(8 * _HISTORY_SIZE))
+        self._hist_ops: List[Optional[List[str]]] = [None] * _HISTORY_SIZE
+        self._hist_cursor = 0
+        # 24 preallocated hourly stats slots indexed by epoch hour; a slot
+        # whose '_epoch_hour' tag is stale is zeroed in place on access
+        self._hourly_slots: List[Dict[str, Any]] = [_new_hour_slot() for _ in range(24)]
         
         # Resource monitoring
         self.resource_monitor = ResourceMonitor()
         
-        # Audit logging
-        self.audit_logger = self._setup_audit_logger()
+        # Audit logging: events are buffered and written in batches by a
+        # single drain task bound to the running event loop; the buffer is
+        # bounded and, in "drop" mode, loses its oldest events on overflow
+        self._audit_fd = self._open_audit_log()
+        self._audit_queue_size = 10000
+        self._audit_pending: deque = deque(maxlen=self._audit_queue_size)
+        self._audit_batch_size = 100
+        self._audit_dropped = 0
+        self._audit_encode_errors = 0
+        self._audit_task: Optional[asyncio.Task] = None
+        self._audit_wakeup: Optional[asyncio.Event] = None
+        self._audit_id_prefix = f"audit_{int(time.time() * 1000)}_"
+        self._audit_ids = itertools.count(1)
         
         # Safety callbacks
         self.safety_callbacks: List[Callable] = []
@@ -233,21 +484,129 @@ class RecoverySafetyManager:
         
         self.logger.info("RecoverySafetyManager initialized")
     
-    def _setup_audit_logger(self) -> logging.Logger:
-        """Setup structured audit logger."""
-        audit_logger = logging.getLogger('RecoveryAudit')
-        audit_logger.setLevel(logging.INFO)
-        
-        # Create file handler for audit log
-        handler = logging.FileHandler(self.audit_log_path)
-        handler.setLevel(logging.INFO)
-        
-        # JSON formatter for structured logging
-        formatter = logging.Formatter('%(message)s')
-        handler.setFormatter(formatter)
-        
-        audit_logger.addHandler(handler)
-        return audit_logger
+    @property
+    def active_recoveries(self) -> Set[str]:
+        """Snapshot of session ids with a recovery in progress."""
+        active: Set[str] = set()
+        for shard in self._recovery_shards:
+            active.update(shard)
+        return active
+    
+    @property
+    def recovery_history(self) -> List[Dict[str, Any]]:
+        """Recent recovery completions, oldest first."""
+        cursor = self._hist_cursor
+        start = max(0, cursor - _HISTORY_SIZE)
+        history = []
+        for i in range(start, cursor):
+            slot = i % _HISTORY_SIZE
+            history.append({
+                'session_id': self._hist_session[slot],
+                'timestamp': datetime.fromtimestamp(self._hist_ts[slot]),
+                'success': bool(self._hist_success[slot]),
+                'execution_time': self._hist_time[slot],
+                'operations': self._hist_ops[slot]
+            })
+        return history
+    
+    def _add_active_recovery(self, session_id: str):
+        """Mark a session as having an active recovery."""
+        index = hash(session_id) % _RECOVERY_SHARDS
+        shard = self._recovery_shards[index]
+        with self._recovery_shard_locks[index]:
+            if session_id in shard:
+                return
+            shard.add(session_id)
+        with self._active_count_lock:
+            self._active_count += 1
+    
+    def _remove_active_recovery(self, session_id: str):
+        """Clear the active recovery marker for a session."""
+        index = hash(session_id) % _RECOVERY_SHARDS
+        shard = self._recovery_shards[index]
+        with self._recovery_shard_locks[index]:
+            if session_id not in shard:
+                return
+            shard.remove(session_id)
+        with self._active_count_lock:
+            self._active_count -= 1
+    
+    def _current_hour_stats(self) -> Dict[str, Any]:
+        """Get the stats slot for the current hour, resetting it if stale."""
+        epoch_hour = int(time.time()) // 3600
+        slot = epoch_hour % 24
+        stats = self._hourly_slots[slot]
+        if stats['_epoch_hour'] != epoch_hour:
+            stats['recovery_attempts'] = 0
+            stats['code_modifications'] = 0
+            stats['total_recovery_time'] = 0.0
+            stats['_epoch_hour'] = epoch_hour
+        return stats
+    
+    def _open_audit_log(self) -> int:
+        """Open the audit log as a raw append-only file descriptor."""
+        return os.open(self.audit_log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    
+    def _ensure_audit_writer(self):
+        """Start the audit drain task on the running loop if needed and wake it."""
+        loop = asyncio.get_running_loop()
+        task = self._audit_task
+        if task is None or task.done() or task.get_loop() is not loop:
+            self._audit_wakeup = asyncio.Event()
+            self._audit_task = loop.create_task(self._audit_drain_loop(self._audit_wakeup))
+        self._audit_wakeup.set()
+    
+    async def _audit_drain_loop(self, wakeup: asyncio.Event):
+        """Drain buffered audit events, one write per batch."""
+        try:
+            while True:
+                await wakeup.wait()
+                wakeup.clear()
+                self._write_pending_audit_events()
+        finally:
+            # Flush whatever is left when the loop shuts the task down
+            self._write_pending_audit_events()
+    
+    def _write_pending_audit_events(self):
+        """Write all buffered audit events to the audit log."""
+        pending = self._audit_pending
+        if not pending:
+            return
+        try:
+            while pending:
+                lines = []
+                for _ in range(min(len(pending), self._audit_batch_size)):
+                    event = pending.popleft()
+                    # Encode per event so one bad payload doesn't cost the batch
+                    try:
+                        lines.append(event.encode() + b"\n")
+                    except Exception as e:
+                        self._audit_encode_errors += 1
+                        self.logger.error(f"Failed to encode audit event {event.event_id}: {e}")
+                if lines:
+                    self._write_audit_payload(b"".join(lines))
+        except Exception as e:
+            self.logger.error(f"Failed to write audit events: {e}")
+    
+    def _write_audit_payload(self, payload: bytes):
+        """Write a payload to the audit fd, retrying on short writes."""
+        view = memoryview(payload)
+        while view:
+            written = os.write(self._audit_fd, view)
+            view = view[written:]
+    
+    def flush_audit_log(self):
+        """Synchronously write any buffered audit events."""
+        self._write_pending_audit_events()
+    
+    def close(self):
+        """Stop resource sampling, flush buffered audit events and close the audit log."""
+        self.resource_monitor.stop()
+        if self._audit_fd is None:
+            return
+        self._write_pending_audit_events()
+        os.close(self._audit_fd)
+        self._audit_fd = None
     
     async def check_recovery_authorization(self, session_id: str, 
                                          operation_type: str,
@@ -268,109 +627,189 @@ class RecoverySafetyManager:
         authorization_start = time.time()
         
         try:
-            # Step 1: Check circuit breakers
-            circuit_check = self._check_circuit_breakers(operation_type)
-            if not circuit_check['can_proceed']:
-                await self._log_audit_event(
-                    AuditEventType.RISKY_OPERATION_BLOCKED,
-                    session_id=session_id,
-                    details={
-                        'operation_type': operation_type,
-                        'reason': 'Circuit breaker open',
-                        'circuit_status': circuit_check
-                    },
-                    risk_level=risk_level
-                )
-                return {
-                    'authorized': False,
-                    'reason': 'Circuit breaker protection active',
-                    'safety_level': SafetyLevel.BLOCKED,
-                    'retry_after': circuit_check.get('retry_after', 300)
-                }
-            
-            # Step 2: Check resource limits
             resource_usage = self.resource_monitor.get_current_usage()
-            resource_violations = resource_usage.exceeds_limits(self.safety_limits)
+            result, event_type, details = self._decide_authorization(
+                session_id, operation_type, risk_level, context,
+                resource_usage,
+                resource_usage.exceeds_limits(self.safety_limits),
+                self._current_hour_stats(),
+                {},
+                authorization_start
+            )
+            
+            if event_type is AuditEventType.RECOVERY_STARTED and not (
+                _SAFETY_RANK[result['safety_level']] >= self._min_started_audit_rank
+                or risk_level in _AUDITED_RISK
+            ):
+                event_type = None
             
-            if resource_violations:
+            if event_type is not None:
                 await self._log_audit_event(
-                    AuditEventType.RESOURCE_LIMIT_EXCEEDED,
+                    event_type,
                     session_id=session_id,
-                    details={
-                        'operation_type': operation_type,
-                        'violations': resource_violations,
-                        'resource_usage': asdict(resource_usage)
-                    },
-                    risk_level=risk_level
+                    details=details,
+                    risk_level=risk_level,
+                    resource_usage=resource_usage
                 )
-                return {
-                    'authorized': False,
-                    'reason': f"Resource limits exceeded: {', '.join(resource_violations)}",
-                    'safety_level': SafetyLevel.BLOCKED,
-                    'resource_usage': asdict(resource_usage)
-                }
-            
-            # Step 3: Check concurrency limits
-            if len(self.active_recoveries) >= self.safety_limits.max_concurrent_recoveries:
-                return {
-                    'authorized': False,
-                    'reason': f"Too many concurrent recoveries: {len(self.active_recoveries)}",
-                    'safety_level': SafetyLevel.RESTRICTED,
-                    'active_recoveries': len(self.active_recoveries)
-                }
-            
-            # Step 4: Check hourly limits
-            current_hour = datetime.now().hour
-            hour_stats = self.hourly_stats[current_hour]
             
-            if hour_stats['recovery_attempts'] >= self.safety_limits.max_recovery_attempts_per_hour:
-                return {
-                    'authorized': False,
-                    'reason': f"Hourly recovery limit exceeded: {hour_stats['recovery_attempts']}",
-                    'safety_level': SafetyLevel.RESTRICTED,
-                    'hourly_stats': hour_stats
-                }
+            return result
             
-            # Step 5: Risk-based authorization
-            safety_level = self._determine_safety_level(risk_level, operation_type, resource_usage)
+        except Exception as e:
+            self.logger.error(f"Recovery authorization failed: {e}")
+            return {
+                'authorized': False,
+                'reason': f"Authorization check failed: {str(e)}",
+                'safety_level': SafetyLevel.BLOCKED
+            }
+    
+    async def check_recovery_authorizations_bulk(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Check a batch of recovery operations in one pass.
+        
+        Resource usage, hourly stats and each circuit breaker are read once for
+        the whole batch, and a single RECOVERY_BATCH_STARTED audit event records
+        which sessions were granted or denied.
+        
+        Args:
+            requests: Dicts with session_id, operation_type, risk_level and
+                optionally context
             
-            if safety_level == SafetyLevel.BLOCKED:
-                return {
+        Returns:
+            Authorization results in request order
+        """
+        authorization_start = time.time()
+        resource_usage = self.resource_monitor.get_current_usage()
+        resource_violations = resource_usage.exceeds_limits(self.safety_limits)
+        hour_stats = self._current_hour_stats()
+        circuit_checks: Dict[str, Dict[str, Any]] = {}
+        
+        results = []
+        granted = []
+        denied = []
+        for request in requests:
+            session_id = request.get('session_id')
+            try:
+                result, _, _ = self._decide_authorization(
+                    session_id, request['operation_type'], request['risk_level'],
+                    request.get('context'), resource_usage, resource_violations,
+                    hour_stats, circuit_checks, authorization_start
+                )
+            except Exception as e:
+                self.logger.error(f"Recovery authorization failed: {e}")
+                result = {
                     'authorized': False,
-                    'reason': f"Operation blocked due to risk level: {risk_level}",
-                    'safety_level': safety_level
+                    'reason': f"Authorization check failed: {str(e)}",
+                    'safety_level': SafetyLevel.BLOCKED
                 }
-            
-            # Step 6: Record authorization
-            self.active_recoveries.add(session_id)
-            hour_stats['recovery_attempts'] += 1
-            
+            results.append(result)
+            (granted if result['authorized'] else denied).append(session_id)
+        
+        if results:
             await self._log_audit_event(
-                AuditEventType.RECOVERY_STARTED,
-                session_id=session_id,
+                AuditEventType.RECOVERY_BATCH_STARTED,
                 details={
-                    'operation_type': operation_type,
-                    'safety_level': safety_level.value,
-                    'authorization_time': time.time() - authorization_start,
-                    'context': context or {}
+                    'batch_ids': [request.get('session_id') for request in requests],
+                    'granted': granted,
+                    'denied': denied,
+                    'authorization_time': time.time() - authorization_start
                 },
-                risk_level=risk_level
+                resource_usage=resource_usage
             )
-            
+        
+        return results
+    
+    def _decide_authorization(self, session_id: str,
+                              operation_type: str,
+                              risk_level: str,
+                              context: Optional[Dict[str, Any]],
+                              resource_usage: ResourceUsage,
+                              resource_violations: List[Tuple[str, float, float]],
+                              hour_stats: Dict[str, Any],
+                              circuit_checks: Dict[str, Dict[str, Any]],
+                              authorization_start: float
+                              ) -> Tuple[Dict[str, Any], Optional[AuditEventType], Optional[Dict[str, Any]]]:
+        """
+        Decide one authorization and record it if granted.
+        
+        Returns:
+            Tuple of (result, audit event type or None, audit details)
+        """
+        # Step 1: Check circuit breakers (once per breaker within a batch)
+        breaker_key, _ = _classify_op(operation_type)
+        circuit_check = circuit_checks.get(breaker_key)
+        if circuit_check is None:
+            circuit_check = self._check_circuit_breakers(operation_type)
+            circuit_checks[breaker_key] = circuit_check
+        if not circuit_check['can_proceed']:
             return {
-                'authorized': True,
-                'reason': 'Authorization granted',
-                'safety_level': safety_level,
-                'conditions': self._get_safety_conditions(safety_level)
+                'authorized': False,
+                'reason': 'Circuit breaker protection active',
+                'safety_level': SafetyLevel.BLOCKED,
+                'retry_after': circuit_check.get('retry_after', 300)
+            }, AuditEventType.RISKY_OPERATION_BLOCKED, {
+                'operation_type': operation_type,
+                'reason': 'Circuit breaker open',
+                'circuit_status': circuit_check
             }
-            
-        except Exception as e:
-            self.logger.error(f"Recovery authorization failed: {e}")
+        
+        # Step 2: Check resource limits
+        if resource_violations:
+            usage_dict = resource_usage.to_dict()
             return {
                 'authorized': False,
-                'reason': f"Authorization check failed: {str(e)}",
-                'safety_level': SafetyLevel.BLOCKED
+                'reason': f"Resource limits exceeded: {', '.join(_format_violations(resource_violations))}",
+                'safety_level': SafetyLevel.BLOCKED,
+                'resource_usage': usage_dict
+            }, AuditEventType.RESOURCE_LIMIT_EXCEEDED, {
+                'operation_type': operation_type,
+                'violations': resource_violations,
+                'resource_usage': usage_dict
             }
+        
+        # Step 3: Check concurrency limits
+        active_count = self._active_count
+        if active_count >= self.safety_limits.max_concurrent_recoveries:
+            return {
+                'authorized': False,
+                'reason': f"Too many concurrent recoveries: {active_count}",
+                'safety_level': SafetyLevel.RESTRICTED,
+                'active_recoveries': active_count
+            }, None, None
+        
+        # Step 4: Check hourly limits
+        if hour_stats['recovery_attempts'] >= self.safety_limits.max_recovery_attempts_per_hour:
+            return {
+                'authorized': False,
+                'reason': f"Hourly recovery limit exceeded: {hour_stats['recovery_attempts']}",
+                'safety_level': SafetyLevel.RESTRICTED,
+                'hourly_stats': _hour_stats_view(hour_stats)
+            }, None, None
+        
+        # Step 5: Risk-based authorization
+        safety_level = self._determine_safety_level(risk_level, operation_type, resource_usage)
+        
+        if safety_level == SafetyLevel.BLOCKED:
+            return {
+                'authorized': False,
+                'reason': f"Operation blocked due to risk level: {risk_level}",
+                'safety_level': safety_level
+            }, None, None
+        
+        # Step 6: Record authorization
+        self._add_active_recovery(session_id)
+        hour_stats['recovery_attempts'] += 1
+        
+        return {
+            'authorized': True,
+            'reason': 'Authorization granted',
+            'safety_level': safety_level,
+            'conditions': self._get_safety_conditions(safety_level)
+        }, AuditEventType.RECOVERY_STARTED, {
+            'operation_type': operation_type,
+            'safety_level': safety_level.value,
+            'authorization_time': time.time() - authorization_start,
+            'context': context or {}
+        }
     
     async def register_recovery_completion(self, session_id: str,
                                          success: bool,
@@ -389,12 +828,10 @@ class RecoverySafetyManager:
         """
         try:
             # Remove from active recoveries
-            if session_id in self.active_recoveries:
-                self.active_recoveries.remove(session_id)
+            self._remove_active_recovery(session_id)
             
             # Update statistics
-            current_hour = datetime.now().hour
-            hour_stats = self.hourly_stats[current_hour]
+            hour_stats = self._current_hour_stats()
             hour_stats['total_recovery_time'] += execution_time
             
             # Count code modifications
@@ -403,22 +840,23 @@ class RecoverySafetyManager:
             
             # Update circuit breaker
             if success:
-                self.circuit_breakers['recovery'].record_success()
+                self._recovery_breaker.record_success()
             else:
-                self.circuit_breakers['recovery'].record_failure()
+                self._recovery_breaker.record_failure()
             
             # Record in history
-            self.recovery_history.append({
-                'session_id': session_id,
-                'timestamp': datetime.now(),
-                'success': success,
-                'execution_time': execution_time,
-                'operations': operations_performed
-            })
+            slot = self._hist_cursor % _HISTORY_SIZE
+            self._hist_session[slot] = session_id
+            self._hist_ts[slot] = time.time()
+            self._hist_success[slot] = success
+            self._hist_time[slot] = execution_time
+            self._hist_ops[slot] = operations_performed
+            self._hist_cursor += 1
             
             # Log audit event
             event_type = AuditEventType.RECOVERY_COMPLETED if success else AuditEventType.RECOVERY_FAILED
             
+            final_usage = self.resource_monitor.get_current_usage()
             await self._log_audit_event(
                 event_type,
                 session_id=session_id,
@@ -426,9 +864,10 @@ class RecoverySafetyManager:
                     'execution_time': execution_time,
                     'operations_performed': operations_performed,
                     'resources_modified': resources_modified or [],
-                    'final_resource_usage': asdict(self.resource_monitor.get_current_usage())
+                    'final_resource_usage': final_usage.to_dict()
                 },
-                risk_level='medium'
+                risk_level='medium',
+                resource_usage=final_usage
             )
             
             self.logger.info(f"Recovery completion registered: {session_id} ({'success' if success else 'failed'})")
@@ -438,14 +877,9 @@ class RecoverySafetyManager:
     
     def _check_circuit_breakers(self, operation_type: str) -> Dict[str, Any]:
         """Check circuit breaker status for operation type."""
-        breaker_key = 'recovery'  # Default
-        
-        if 'code' in operation_type.lower():
-            breaker_key = 'code_fix'
-        elif 'command' in operation_type.lower():
-            breaker_key = 'command_retry'
+        breaker_key, _ = _classify_op(operation_type)
         
-        breaker = self.circuit_breakers.get(breaker_key, self.circuit_breakers['recovery'])
+        breaker = self._breaker_map[breaker_key]
         can_proceed = breaker.can_proceed()
         
         return {
@@ -459,7 +893,7 @@ class RecoverySafetyManager:
                                resource_usage: ResourceUsage) -> SafetyLevel:
         """Determine safety level for operation."""
         # High risk operations are more restricted
-        if risk_level in ['critical', 'maximum']:
+        if risk_level in _HIGH_RISK:
             return SafetyLevel.RESTRICTED
         
         # High resource usage increases restrictions
@@ -470,48 +904,53 @@ class RecoverySafetyManager:
             return SafetyLevel.CAUTIOUS
         
         # Code modifications are inherently risky
-        if 'code' in operation_type.lower() and resource_usage.code_modifications_hour > 3:
+        if _classify_op(operation_type)[1] and resource_usage.code_modifications_hour > 3:
             return SafetyLevel.CAUTIOUS
         
         return SafetyLevel.SAFE
     
-    def _get_safety_conditions(self, safety_level: SafetyLevel) -> List[str]:
+    def _get_safety_conditions(self, safety_level: SafetyLevel) -> Tuple[str, ...]:
         """Get safety conditions for given safety level."""
-        conditions = []
-        
-        if safety_level == SafetyLevel.RESTRICTED:
-            conditions.extend([
-                "Additional confirmation required for risky operations",
-                "Enhanced monitoring and logging active",
-                "Automatic rollback enabled"
-            ])
-        elif safety_level == SafetyLevel.CAUTIOUS:
-            conditions.extend([
-                "Increased monitoring active",
-                "Resource usage will be tracked closely"
-            ])
-        
-        return conditions
+        return _SAFETY_CONDITIONS[safety_level]
     
     async def _log_audit_event(self, event_type: AuditEventType,
                              session_id: str = None,
                              details: Dict[str, Any] = None,
-                             risk_level: str = 'medium'):
-        """Log audit event with structured data."""
+                             risk_level: str = 'medium',
+                             resource_usage: Optional[ResourceUsage] = None):
+        """
+        Log audit event with structured data.
+        
+        Args:
+            event_type: Type of audit event
+            session_id: Recovery session ID
+            details: Event-specific details
+            risk_level: Risk level of the operation
+            resource_usage: Usage snapshot the caller already holds; sampled if omitted
+        """
         try:
+            if resource_usage is None:
+                resource_usage = self.resource_monitor.get_current_usage()
+
             event = AuditEvent(
-                event_id=f"audit_{int(time.time() * 1000)}",
+                event_id=f"{self._audit_id_prefix}{next(self._audit_ids)}",
                 event_type=event_type,
                 timestamp=datetime.now(),
                 session_id=session_id,
                 user_id=None,  # Could be populated from context
                 details=details or {},
                 risk_level=risk_level,
-                resource_usage=asdict(self.resource_monitor.get_current_usage())
+                resource_usage=resource_usage.to_dict()
             )
             
-            # Log as JSON line
-            self.audit_logger.info(json.dumps(event.to_dict()))
+            # Queue for the batched writer
+            if len(self._audit_pending) >= self._audit_queue_size:
+                if self.audit_backpressure_mode == "block":
+                    self._write_pending_audit_events()
+                else:
+                    self._audit_dropped += 1
+            self._audit_pending.append(event)
+            self._ensure_audit_writer()
             
         except Exception as e:
             self.logger.error(f"Failed to log audit event: {e}")
@@ -519,15 +958,26 @@ class RecoverySafetyManager:
     def get_safety_status(self) -> Dict[str, Any]:
         """Get comprehensive safety status."""
         return {
-            'active_recoveries': len(self.active_recoveries),
-            'resource_usage': asdict(self.resource_monitor.get_current_usage()),
+            'active_recoveries': self._active_count,
+            'resource_usage': self.resource_monitor.get_current_usage().to_dict(),
             'circuit_breakers': {
-                name: breaker.get_status() 
+                name: breaker.get_status_nolock()
                 for name, breaker in self.circuit_breakers.items()
             },
-            'hourly_stats': dict(self.hourly_stats),
+            'hourly_stats': self._recent_hourly_stats(),
             'safety_limits': asdict(self.safety_limits),
-            'recent_violations': self._get_recent_violations()
+            'recent_violations': self._get_recent_violations(),
+            'audit_dropped_events': self._audit_dropped,
+            'audit_encode_errors': self._audit_encode_errors
+        }
+    
+    def _recent_hourly_stats(self) -> Dict[int, Dict[str, Any]]:
+        """Get stats for the last 24 hours keyed by slot (epoch hour mod 24)."""
+        oldest = int(time.time()) // 3600 - 23
+        return {
+            stats['_epoch_hour'] % 24: _hour_stats_view(stats)
+            for stats in self._hourly_slots
+            if stats['_epoch_hour'] >= oldest
         }
     
     def _get_recent_violations(self) -> List[Dict[str, Any]]:
@@ -539,50 +989,52 @@ class RecoverySafetyManager:
     def add_safety_callback(self, callback: Callable):
         """Add callback for safety events."""
         self.safety_callbacks.append(callback)
-    
-    def cleanup_expired_data(self):
-        """Clean up expired tracking data."""
-        # Clean up old hourly stats (keep last 24 hours)
-        current_hour = datetime.now().hour
-        hours_to_keep = set((current_hour - i) % 24 for i in range(24))
-        
-        keys_to_remove = [
-            hour for hour in self.hourly_stats.keys() 
-            if hour not in hours_to_keep
-        ]
-        
-        for hour in keys_to_remove:
-            del self.hourly_stats[hour]
-        
-        self.logger.info(f"Cleaned up {len(keys_to_remove)} expired hour stats")
 
 
 class ResourceMonitor:
     """Monitor system resources for safety limits."""
     
-    def __init__(self):
-        """Initialize resource monitor."""
+    def __init__(self, sample_interval_seconds: float = 1.0):
+        """
+        Initialize resource monitor.
+        
+        Args:
+            sample_interval_seconds: How often the background sampler refreshes usage
+        """
         self.logger = logging.getLogger(f'{self.__class__.__name__}')
+        self.sample_interval_seconds = sample_interval_seconds
+        self._process = psutil.Process() if PSUTIL_AVAILABLE else None
+        self._stop_sampling = threading.Event()
+        
+        # Latest sample; replaced wholesale by the sampler, read without locking
+        self._snapshot = self._sample_usage()
+        
+        self._sampler: Optional[threading.Thread] = None
+        if self._process is not None:
+            self._sampler = threading.Thread(
+                target=self._sample_loop, name='ResourceMonitorSampler', daemon=True
+            )
+            self._sampler.start()
     
     def get_current_usage(self) -> ResourceUsage:
-        """Get current resource usage."""
-        try:
-            import psutil
-            
-            # Get current process info
-            process = psutil.Process()
-            memory_info = process.memory_info()
-            
-            return ResourceUsage(
-                memory_usage_mb=memory_info.rss / 1024 / 1024,
-                disk_usage_mb=0.0,  # Would implement disk usage tracking
-                cpu_percent=process.cpu_percent(),
-                active_recoveries=0,  # Will be set by caller
-                total_recovery_time_hour=0.0,  # Will be set by caller
-                code_modifications_hour=0  # Will be set by caller
-            )
-            
-        except ImportError:
+        """Get the most recently sampled resource usage."""
+        return self._snapshot
+    
+    def stop(self, timeout: float = 1.0):
+        """Stop the background sampler, waiting up to timeout seconds for it to exit."""
+        self._stop_sampling.set()
+        sampler = self._sampler
+        if sampler is not None and sampler is not threading.current_thread():
+            sampler.join(timeout)
+    
+    def _sample_loop(self):
+        """Refresh the usage snapshot until stopped."""
+        while not self._stop_sampling.wait(self.sample_interval_seconds):
+            self._snapshot = self._sample_usage()
+    
+    def _sample_usage(self) -> ResourceUsage:
+        """Sample current resource usage."""
+        if self._process is None:
             # Fallback if psutil not available
             return ResourceUsage(
                 memory_usage_mb=50.0,  # Estimated
@@ -593,6 +1045,18 @@ class ResourceMonitor:
                 code_modifications_hour=0
             )
         
+        try:
+            memory_info = self._process.memory_info()
+            
+            return ResourceUsage(
+                memory_usage_mb=memory_info.rss / 1024 / 1024,
+                disk_usage_mb=0.0,  # Would implement disk usage tracking
+                cpu_percent=self._process.cpu_percent(),
+                active_recoveries=0,  # Will be set by caller
+                total_recovery_time_hour=0.0,  # Will be set by caller
+                code_modifications_hour=0  # Will be set by caller
+            )
+        
         except Exception as e:
             self.logger.error(f"Resource monitoring failed: {e}")
             return ResourceUsage(
@@ -607,9 +1071,10 @@ class ResourceMonitor:
 
 # Convenience functions
 def create_safety_manager(safety_limits: SafetyLimits = None, 
-                         audit_log_path: str = None) -> RecoverySafetyManager:
+                         audit_log_path: str = None,
+                         audit_backpressure_mode: str = "drop") -> RecoverySafetyManager:
     """Create recovery safety manager."""
-    return RecoverySafetyManager(safety_limits, audit_log_path)
+    return RecoverySafetyManager(safety_limits, audit_log_path, audit_backpressure_mode)
 
 
 def create_default_safety_limits() -> SafetyLimits:
@@ -20,18 +20,55 @@ Date: 2025-01-26
 """
 
 import asyncio
+import hashlib
+import itertools
 import json
 import logging
+import os
+import random
+import secrets
+import sys
 import time
-from datetime import datetime, timedelta
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from datetime import datetime, timedelta, timezone
 from typing import Dict, Any, List, Optional, Tuple
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, field
 from enum import Enum
 
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
 from .error_analysis import ErrorAnalysis, ErrorCategory, ErrorSeverity, ErrorClassifier
 from .confirmation_system import ConfirmationGateSystem, RiskLevel
 
 
+if ORJSON_AVAILABLE:
+    def _encode_session_record(record: Dict[str, Any]) -> bytes:
+        """Encode a serialized session as compact JSON bytes."""
+        return orjson.dumps(record, default=str, option=orjson.OPT_NON_STR_KEYS)
+else:
+    def _encode_session_record(record: Dict[str, Any]) -> bytes:
+        """Encode a serialized session as compact JSON bytes."""
+        return json.dumps(record, default=str).encode('utf-8')
+
+
 class RecoveryStatus(Enum):
     """Status of recovery attempt."""
     PENDING = "pending"
@@ -51,7 +88,62 @@ class RecoveryStrategy(Enum):
     MANUAL_INTERVENTION = "manual_intervention"
 
 
-@dataclass
+# Interned enum values, looked up once instead of per serialization
+_STRATEGY_VALUE = {s: sys.intern(s.value) for s in RecoveryStrategy}
+_STATUS_VALUE = {s: sys.intern(s.value) for s in RecoveryStatus}
+
+
+# Recovery strategy routing keyed by (requires_code_fix, requires_command_retry,
+# category, severity); combinations not listed default to multi-step recovery
+_STRATEGY_TABLE: Dict[Tuple[bool, bool, ErrorCategory, ErrorSeverity], RecoveryStrategy] = {
+    # Code errors typically require code fixes; severe ones get the full workflow
+    **{
+        (True, retry, category, severity): RecoveryStrategy.CODE_FIX_REQUIRED
+        for retry in (False, True)
+        for category in ErrorCategory
+        for severity in (ErrorSeverity.LOW, ErrorSeverity.MEDIUM)
+    },
+    # Command syntax errors can often be fixed by retry
+    **{
+        (False, True, ErrorCategory.COMMAND_SYNTAX, severity): RecoveryStrategy.COMMAND_RETRY
+        for severity in ErrorSeverity
+    },
+    # Critical system errors require manual intervention
+    (False, False, ErrorCategory.SYSTEM_ERROR, ErrorSeverity.CRITICAL): RecoveryStrategy.MANUAL_INTERVENTION,
+    # Unknown errors start with web research
+    **{
+        (False, False, ErrorCategory.UNKNOWN_ERROR, severity): RecoveryStrategy.WEB_RESEARCH_ONLY
+        for severity in ErrorSeverity
+    }
+}
+
+
+# Known error message fragments and the tag each one reports
+_ERROR_PATTERNS = (
+    ('cmd_not_found', 'command not found'),
+    ('no_such_file', 'No such file or directory'),
+    ('module_not_found', 'ModuleNotFoundError'),
+    ('syntax_error', 'SyntaxError'),
+)
+
+# Scans a message for every pattern in one pass when pyahocorasick is installed
+_PATTERN_AUTOMATON = None
+if AHOCORASICK_AVAILABLE:
+    _PATTERN_AUTOMATON = ahocorasick.Automaton()
+    for _tag, _needle in _ERROR_PATTERNS:
+        _PATTERN_AUTOMATON.add_word(_needle, _tag)
+    _PATTERN_AUTOMATON.make_automaton()
+
+
+@lru_cache(maxsize=1024)
+def _match_error_patterns(message: str) -> frozenset:
+    """Return the tags of all known error patterns found in ``message``."""
+    if _PATTERN_AUTOMATON is not None:
+        return frozenset(tag for _, tag in _PATTERN_AUTOMATON.iter(message))
+    return frozenset(tag for tag, needle in _ERROR_PATTERNS if needle in message)
+
+
+@dataclass(slots=True)
 class RecoveryAttempt:
     """Single recovery attempt record."""
     attempt_id: str
@@ -61,18 +153,31 @@ class RecoveryAttempt:
     success: bool
     execution_time: float
     error_message: Optional[str]
-    timestamp: datetime
+    timestamp: float  # Epoch seconds, formatted only on serialization
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for serialization."""
         return {
-            **asdict(self),
-            'strategy': self.strategy.value,
-            'timestamp': self.timestamp.isoformat()
+            'attempt_id': self.attempt_id,
+            'strategy': _STRATEGY_VALUE[self.strategy],
+            'actions_taken': list(self.actions_taken),
+            'agents_involved': list(self.agents_involved),
+            'success': self.success,
+            'execution_time': self.execution_time,
+            'error_message': self.error_message,
+            'timestamp': datetime.fromtimestamp(self.timestamp, tz=timezone.utc).isoformat()
         }
 
 
-@dataclass
+def _copy_attempt_dict(attempt: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy a serialized attempt and its action/agent lists; other values are immutable."""
+    copied = dict(attempt)
+    copied['actions_taken'] = list(attempt['actions_taken'])
+    copied['agents_involved'] = list(attempt['agents_involved'])
+    return copied
+
+
+@dataclass(slots=True)
 class RecoverySession:
     """Complete recovery session tracking."""
     session_id: str
@@ -87,16 +192,31 @@ class RecoverySession:
     commands_retried: List[str]
     manual_intervention_required: bool
     session_log: List[str]
+    # Serialized attempts, in order; attempts are append-only so only new ones
+    # are converted on each to_dict(). Callers get copies, never these dicts.
+    _attempt_dicts: List[Dict[str, Any]] = field(default_factory=list, init=False, repr=False, compare=False)
     
     def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary for serialization."""
+        """
+        Convert to dictionary for serialization.
+        
+        attempts is treated as append-only: attempts already serialized are
+        not re-read, so replace an attempt by rebuilding the session. The
+        cache is reset if attempts shrinks.
+        """
+        attempt_dicts = self._attempt_dicts
+        if len(attempt_dicts) > len(self.attempts):
+            attempt_dicts.clear()
+        if len(attempt_dicts) < len(self.attempts):
+            attempt_dicts.extend(attempt.to_dict() for attempt in self.attempts[len(attempt_dicts):])
+        
         return {
             'session_id': self.session_id,
             'original_error': self.original_error.to_dict(),
-            'recovery_strategy': self.recovery_strategy.value,
+            'recovery_strategy': _STRATEGY_VALUE[self.recovery_strategy],
             'max_attempts': self.max_attempts,
-            'attempts': [attempt.to_dict() for attempt in self.attempts],
-            'final_status': self.final_status.value,
+            'attempts': [_copy_attempt_dict(attempt) for attempt in attempt_dicts],
+            'final_status': _STATUS_VALUE[self.final_status],
             'total_time': self.total_time,
             'research_results': self.research_results,
             'code_fixes_applied': self.code_fixes_applied,
@@ -104,6 +224,10 @@ class RecoverySession:
             'manual_intervention_required': self.manual_intervention_required,
             'session_log': self.session_log
         }
+    
+    def to_json_bytes(self) -> bytes:
+        """Serialize to JSON bytes, using orjson when available."""
+        return _encode_session_record(self.to_dict())
 
 
 class RecoveryWorkflowOrchestrator:
@@ -138,6 +262,14 @@ class RecoveryWorkflowOrchestrator:
             'code_fix_timeout': 60,
             'command_retry_timeout': 15,
             'exponential_backoff_base': 2,
+            'max_backoff': 30,
+            'max_concurrent_sessions': 4,
+            'research_cache_ttl': 3600,
+            'max_completed_sessions': 2000,
+            'completed_session_ttl': 3600,
+            'cpu_workers': None,  # Defaults to os.cpu_count()
+            'session_store_url': None,  # e.g. redis://localhost:6379/0
+            'session_store_ttl': 86400,
             'safety_limits': {
                 'max_code_modifications': 5,
                 'max_command_retries': 3,
@@ -147,7 +279,55 @@ class RecoveryWorkflowOrchestrator:
         
         # Active recovery sessions
         self.active_sessions: Dict[str, RecoverySession] = {}
+        # Sequence number in session IDs; the random suffix keeps IDs unique
+        # across orchestrators and processes sharing a session store
+        self._session_counter = itertools.count()
         self.completed_sessions: Dict[str, RecoverySession] = {}
+        # (monotonic completion time, session) in completion order; bounds
+        # completed_sessions by count and by completed_session_ttl
+        self._completed_order: deque = deque(maxlen=self.config['max_completed_sessions'])
+        # Running totals over every completed session, for get_recovery_statistics
+        self._stats = {
+            'total': 0,
+            'success': 0,
+            'total_time': 0.0,
+            'per_strategy': defaultdict(lambda: {'total': 0, 'successful': 0})
+        }
+        
+        # Research results by error signature: key -> (monotonic time, results),
+        # oldest first; identical in-flight lookups share one task
+        self._research_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._research_inflight: Dict[str, asyncio.Task] = {}
+        
+        # Session log lines are buffered and appended to their sessions by a
+        # drain task on the running loop; flushed before a session is returned
+        self._log_buffer: deque = deque()
+        self._log_drain_task: Optional[asyncio.Task] = None
+        self._log_wakeup: Optional[asyncio.Event] = None
+        
+        # Workflow handler per strategy; anything else gets manual intervention
+        self._dispatch = {
+            RecoveryStrategy.WEB_RESEARCH_ONLY: self._execute_web_research_workflow,
+            RecoveryStrategy.CODE_FIX_REQUIRED: self._execute_code_fix_workflow,
+            RecoveryStrategy.COMMAND_RETRY: self._execute_command_retry_workflow,
+            RecoveryStrategy.MULTI_STEP_RECOVERY: self._execute_multi_step_workflow
+        }
+        
+        # Optional Redis snapshots of sessions under recovery:{session_id},
+        # readable from other processes; client created per event loop
+        self._session_store = None
+        self._session_store_loop: Optional[asyncio.AbstractEventLoop] = None
+        
+        # Recoveries in progress by error signature; identical concurrent
+        # errors await the same task instead of starting new sessions
+        self._recovery_inflight: Dict[str, asyncio.Task] = {}
+        
+        # Shared pool for CPU-bound work kept off the event loop; created on first use
+        self._cpu_pool: Optional[ThreadPoolExecutor] = None
+        
+        # Caps concurrently executing workflows; created per event loop
+        self._session_sem: Optional[asyncio.Semaphore] = None
+        self._session_sem_loop: Optional[asyncio.AbstractEventLoop] = None
         
         # Logging
         self.logger = logging.getLogger(f'{self.__class__.__name__}')
@@ -167,8 +347,35 @@ class RecoveryWorkflowOrchestrator:
             context: Additional context for recovery
             
         Returns:
-            RecoverySession with complete recovery information
+            RecoverySession with complete recovery information; concurrent
+            recoveries of the same error share one session
         """
+        key = self._recovery_key(error_analysis)
+        
+        task = self._recovery_inflight.get(key)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(self._run_recovery_session(key, error_analysis))
+            self._recovery_inflight[key] = task
+        else:
+            self.logger.info(f"Joining in-flight recovery for {error_analysis.category.value} error")
+        return await asyncio.shield(task)
+    
+    @staticmethod
+    def _recovery_key(error_analysis: ErrorAnalysis) -> str:
+        """Build the in-flight recovery key for an error."""
+        signature = f"{error_analysis.category.value}|{error_analysis.primary_message}|{error_analysis.context.command}"
+        return hashlib.blake2b(signature.encode('utf-8'), digest_size=16).hexdigest()
+    
+    async def _run_recovery_session(self, key: str, error_analysis: ErrorAnalysis) -> RecoverySession:
+        """Run a recovery session, then release its in-flight key."""
+        try:
+            return await self._execute_recovery_session(error_analysis)
+        finally:
+            if self._recovery_inflight.get(key) is asyncio.current_task():
+                del self._recovery_inflight[key]
+    
+    async def _execute_recovery_session(self, error_analysis: ErrorAnalysis) -> RecoverySession:
+        """Create a recovery session and run its workflow to completion."""
         session_start = time.time()
         session_id = self._generate_session_id()
         
@@ -194,27 +401,21 @@ class RecoveryWorkflowOrchestrator:
         )
         
         self.active_sessions[session_id] = session
-        session.session_log.append(f"Recovery session initiated: {recovery_strategy.value}")
+        self._log(session, f"Recovery session initiated: {recovery_strategy.value}")
+        await self._persist_session(session)
         
         try:
             # Execute recovery workflow based on strategy
-            if recovery_strategy == RecoveryStrategy.WEB_RESEARCH_ONLY:
-                await self._execute_web_research_workflow(session)
-            elif recovery_strategy == RecoveryStrategy.CODE_FIX_REQUIRED:
-                await self._execute_code_fix_workflow(session)
-            elif recovery_strategy == RecoveryStrategy.COMMAND_RETRY:
-                await self._execute_command_retry_workflow(session)
-            elif recovery_strategy == RecoveryStrategy.MULTI_STEP_RECOVERY:
-                await self._execute_multi_step_workflow(session)
-            else:
-                await self._execute_manual_intervention_workflow(session)
+            handler = self._dispatch.get(recovery_strategy, self._execute_manual_intervention_workflow)
+            async with self._get_session_semaphore():
+                await handler(session)
             
             session.total_time = time.time() - session_start
+            self._drain_session_logs()
             
             # Move to completed sessions
-            self.completed_sessions[session_id] = session
-            if session_id in self.active_sessions:
-                del self.active_sessions[session_id]
+            self._complete_session(session)
+            await self._persist_session(session)
             
             self.logger.info(f"✅ Recovery session {session_id} completed: {session.final_status.value} in {session.total_time:.2f}s")
             
@@ -223,73 +424,187 @@ class RecoveryWorkflowOrchestrator:
         except Exception as e:
             session.final_status = RecoveryStatus.FAILED
             session.total_time = time.time() - session_start
-            session.session_log.append(f"Recovery failed with exception: {str(e)}")
+            self._log(session, f"Recovery failed with exception: {str(e)}")
+            self._drain_session_logs()
             
             self.logger.error(f"❌ Recovery session {session_id} failed: {e}")
             
             # Move to completed sessions
-            self.completed_sessions[session_id] = session
-            if session_id in self.active_sessions:
-                del self.active_sessions[session_id]
+            self._complete_session(session)
+            await self._persist_session(session)
             
             return session
     
-    def _generate_session_id(self) -> str:
-        """Generate unique session ID."""
-        timestamp = int(time.time() * 1000)
-        return f"recovery_{timestamp}"
+    async def run_batch(self, errors: List[ErrorAnalysis]) -> List[RecoverySession]:
+        """
+        Recover from a batch of errors concurrently.
+        
+        Workflows are paced by the max_concurrent_sessions limit.
+        
+        Args:
+            errors: Analyzed errors to recover from
+            
+        Returns:
+            Recovery sessions in the same order as the errors
+        """
+        return list(await asyncio.gather(*[self.initiate_recovery(error) for error in errors]))
     
-    def _determine_recovery_strategy(self, error_analysis: ErrorAnalysis) -> RecoveryStrategy:
-        """Determine appropriate recovery strategy based on error analysis."""
+    async def aclose(self):
+        """Stop the session log drain task and shut down the CPU worker pool."""
+        task = self._log_drain_task
+        self._log_drain_task = None
+        if task is not None and not task.done():
+            task.cancel()
+            if task.get_loop() is asyncio.get_running_loop():
+                # The drainer flushes remaining lines as it unwinds
+                await asyncio.gather(task, return_exceptions=True)
+        self._drain_session_logs()
         
-        # Code errors typically require code fixes
-        if error_analysis.requires_code_fix:
-            if error_analysis.severity in [ErrorSeverity.HIGH, ErrorSeverity.CRITICAL]:
-                return RecoveryStrategy.MULTI_STEP_RECOVERY
-            else:
-                return RecoveryStrategy.CODE_FIX_REQUIRED
+        pool = self._cpu_pool
+        self._cpu_pool = None
+        if pool is not None:
+            pool.shutdown(wait=False)
+    
+    def _get_session_semaphore(self) -> asyncio.Semaphore:
+        """Get the session semaphore for the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._session_sem is None or self._session_sem_loop is not loop:
+            self._session_sem = asyncio.Semaphore(self.config.get('max_concurrent_sessions', 4))
+            self._session_sem_loop = loop
+        return self._session_sem
+    
+    def _get_session_store(self):
+        """Get the Redis session store client for the running loop, if configured."""
+        url = self.config.get('session_store_url')
+        if not url or not REDIS_AVAILABLE:
+            return None
         
-        # Command syntax errors can often be fixed by retry
-        elif error_analysis.requires_command_retry:
-            if error_analysis.category == ErrorCategory.COMMAND_SYNTAX:
-                return RecoveryStrategy.COMMAND_RETRY
-            else:
-                return RecoveryStrategy.MULTI_STEP_RECOVERY
+        loop = asyncio.get_running_loop()
+        if self._session_store is None or self._session_store_loop is not loop:
+            self._session_store = aioredis.from_url(url)
+            self._session_store_loop = loop
+        return self._session_store
+    
+    async def _persist_session(self, session: RecoverySession):
+        """Write a session snapshot to the session store, if configured."""
+        store = self._get_session_store()
+        if store is None:
+            return
         
-        # System errors often require manual intervention
-        elif error_analysis.category == ErrorCategory.SYSTEM_ERROR:
-            if error_analysis.severity == ErrorSeverity.CRITICAL:
-                return RecoveryStrategy.MANUAL_INTERVENTION
-            else:
-                return RecoveryStrategy.MULTI_STEP_RECOVERY
+        self._drain_session_logs()
+        try:
+            payload = await self._run_cpu_bound(session.to_json_bytes)
+            await store.set(f"recovery:{session.session_id}", payload,
+                            ex=self.config['session_store_ttl'])
+        except Exception as e:
+            self.logger.warning(f"Failed to persist recovery session {session.session_id}: {e}")
+    
+    async def _run_cpu_bound(self, func, *args):
+        """Run a CPU-bound callable on the shared worker pool."""
+        if self._cpu_pool is None:
+            self._cpu_pool = ThreadPoolExecutor(
+                max_workers=self.config['cpu_workers'] or os.cpu_count(),
+                thread_name_prefix='recovery-cpu'
+            )
+        return await asyncio.get_running_loop().run_in_executor(self._cpu_pool, func, *args)
+    
+    def _complete_session(self, session: RecoverySession):
+        """Move a session from active to completed, evicting expired and excess sessions."""
+        now = time.monotonic()
+        self._evict_expired_sessions(now)
         
-        # Unknown errors start with web research
-        elif error_analysis.category == ErrorCategory.UNKNOWN_ERROR:
-            return RecoveryStrategy.WEB_RESEARCH_ONLY
+        order = self._completed_order
+        if len(order) == order.maxlen:
+            self._forget_completed(order[0][1])
+        order.append((now, session))
+        self.completed_sessions[session.session_id] = session
+        self.active_sessions.pop(session.session_id, None)
         
-        # Default to multi-step recovery for complex cases
-        else:
-            return RecoveryStrategy.MULTI_STEP_RECOVERY
+        stats = self._stats
+        succeeded = session.final_status == RecoveryStatus.SUCCESS
+        stats['total'] += 1
+        stats['total_time'] += session.total_time
+        strategy_stats = stats['per_strategy'][session.recovery_strategy.value]
+        strategy_stats['total'] += 1
+        if succeeded:
+            stats['success'] += 1
+            strategy_stats['successful'] += 1
+    
+    def _evict_expired_sessions(self, now: float = None):
+        """Drop completed sessions older than completed_session_ttl."""
+        if now is None:
+            now = time.monotonic()
+        cutoff = now - self.config['completed_session_ttl']
+        
+        order = self._completed_order
+        while order and order[0][0] < cutoff:
+            self._forget_completed(order.popleft()[1])
+    
+    def _forget_completed(self, session: RecoverySession):
+        """Remove a completed session from the lookup table unless its ID was reused."""
+        if self.completed_sessions.get(session.session_id) is session:
+            del self.completed_sessions[session.session_id]
+    
+    def _log(self, session: RecoverySession, line: str):
+        """Queue a line for the session log."""
+        self._log_buffer.append((session, line))
+        
+        loop = asyncio.get_running_loop()
+        task = self._log_drain_task
+        if task is None or task.done() or task.get_loop() is not loop:
+            self._log_wakeup = asyncio.Event()
+            self._log_drain_task = loop.create_task(self._log_drainer(self._log_wakeup))
+        self._log_wakeup.set()
+    
+    async def _log_drainer(self, wakeup: asyncio.Event):
+        """Append buffered log lines to their sessions."""
+        try:
+            while True:
+                await wakeup.wait()
+                wakeup.clear()
+                self._drain_session_logs()
+        finally:
+            self._drain_session_logs()
+    
+    def _drain_session_logs(self):
+        """Append all buffered log lines, up to 64 at a time."""
+        buffer = self._log_buffer
+        while buffer:
+            batch = [buffer.popleft() for _ in range(min(len(buffer), 64))]
+            for session, line in batch:
+                session.session_log.append(line)
+    
+    def _generate_session_id(self) -> str:
+        """Generate unique session ID."""
+        return f"recovery_{next(self._session_counter):08x}_{secrets.token_hex(4)}"
+    
+    def _determine_recovery_strategy(self, error_analysis: ErrorAnalysis) -> RecoveryStrategy:
+        """Determine appropriate recovery strategy based on error analysis."""
+        key = (error_analysis.requires_code_fix, error_analysis.requires_command_retry,
+               error_analysis.category, error_analysis.severity)
+        return _STRATEGY_TABLE.get(key, RecoveryStrategy.MULTI_STEP_RECOVERY)
     
-    async def _execute_web_research_workflow(self, session: RecoverySession):
-        """Execute web research workflow to find solutions."""
-        session.session_log.append("Starting web research workflow")
+    async def _execute_web_research_workflow(self, session: RecoverySession,
+                                             research_results: Optional[Dict[str, Any]] = None):
+        """Execute web research workflow to find solutions, reusing research_results if given."""
+        self._log(session, "Starting web research workflow")
         
         attempt_id = f"{session.session_id}_research"
         attempt_start = time.time()
         
         try:
             # Step 1: Conduct web research
-            research_results = await self._conduct_web_research(session.original_error)
+            if research_results is None:
+                research_results = await self._conduct_web_research(session.original_error)
             session.research_results = research_results
             
             # Step 2: Analyze research results
             if research_results and research_results.get('success'):
                 session.final_status = RecoveryStatus.SUCCESS
-                session.session_log.append("Web research provided solution guidance")
+                self._log(session, "Web research provided solution guidance")
             else:
                 session.final_status = RecoveryStatus.FAILED
-                session.session_log.append("Web research did not find useful solutions")
+                self._log(session, "Web research did not find useful solutions")
             
             # Record attempt
             attempt = RecoveryAttempt(
@@ -300,13 +615,13 @@ class RecoveryWorkflowOrchestrator:
                 success=session.final_status == RecoveryStatus.SUCCESS,
                 execution_time=time.time() - attempt_start,
                 error_message=None,
-                timestamp=datetime.now()
+                timestamp=attempt_start
             )
             session.attempts.append(attempt)
             
         except Exception as e:
             session.final_status = RecoveryStatus.FAILED
-            session.session_log.append(f"Web research workflow failed: {str(e)}")
+            self._log(session, f"Web research workflow failed: {str(e)}")
             
             attempt = RecoveryAttempt(
                 attempt_id=attempt_id,
@@ -316,32 +631,35 @@ class RecoveryWorkflowOrchestrator:
                 success=False,
                 execution_time=time.time() - attempt_start,
                 error_message=str(e),
-                timestamp=datetime.now()
+                timestamp=attempt_start
             )
             session.attempts.append(attempt)
     
-    async def _execute_code_fix_workflow(self, session: RecoverySession):
-        """Execute code fix workflow using CodeEditorAgent."""
-        session.session_log.append("Starting code fix workflow")
+    async def _execute_code_fix_workflow(self, session: RecoverySession,
+                                         research_results: Optional[Dict[str, Any]] = None):
+        """Execute code fix workflow using CodeEditorAgent, reusing research_results if given."""
+        self._log(session, "Starting code fix workflow")
         
         attempt_id = f"{session.session_id}_codefix"
         attempt_start = time.time()
         
         try:
-            # Step 1: Research solutions first
-            research_results = await self._conduct_web_research(session.original_error)
+            # Step 1: Research solutions while preparing the code fix context
+            research_results, fix_context = await self._research_and_prepare_code_fix(
+                session.original_error, research_results
+            )
             session.research_results = research_results
             
             # Step 2: Apply code fixes
-            code_fix_results = await self._apply_code_fixes(session.original_error, research_results)
+            code_fix_results = await self._apply_code_fixes(session.original_error, research_results, fix_context)
             
             if code_fix_results.get('success'):
                 session.code_fixes_applied = code_fix_results.get('fixes_applied', [])
                 session.final_status = RecoveryStatus.SUCCESS
-                session.session_log.append(f"Code fixes applied: {len(session.code_fixes_applied)}")
+                self._log(session, f"Code fixes applied: {len(session.code_fixes_applied)}")
             else:
                 session.final_status = RecoveryStatus.FAILED
-                session.session_log.append("Code fix application failed")
+                self._log(session, "Code fix application failed")
             
             # Record attempt
             attempt = RecoveryAttempt(
@@ -352,13 +670,13 @@ class RecoveryWorkflowOrchestrator:
                 success=session.final_status == RecoveryStatus.SUCCESS,
                 execution_time=time.time() - attempt_start,
                 error_message=code_fix_results.get('error'),
-                timestamp=datetime.now()
+                timestamp=attempt_start
             )
             session.attempts.append(attempt)
             
         except Exception as e:
             session.final_status = RecoveryStatus.FAILED
-            session.session_log.append(f"Code fix workflow failed: {str(e)}")
+            self._log(session, f"Code fix workflow failed: {str(e)}")
             
             attempt = RecoveryAttempt(
                 attempt_id=attempt_id,
@@ -368,28 +686,32 @@ class RecoveryWorkflowOrchestrator:
                 success=False,
                 execution_time=time.time() - attempt_start,
                 error_message=str(e),
-                timestamp=datetime.now()
+                timestamp=attempt_start
             )
             session.attempts.append(attempt)
     
-    async def _execute_command_retry_workflow(self, session: RecoverySession):
-        """Execute command retry workflow with corrected commands."""
-        session.session_log.append("Starting command retry workflow")
+    async def _execute_command_retry_workflow(self, session: RecoverySession,
+                                              research_results: Optional[Dict[str, Any]] = None):
+        """Execute command retry workflow with corrected commands, informed by research_results if given."""
+        self._log(session, "Starting command retry workflow")
         
         max_retries = self.config['safety_limits']['max_command_retries']
         
+        # Generate every candidate correction up front in one request
+        candidates = await self._generate_corrected_commands(
+            session.original_error, max_retries, research_results
+        )
+        
         for retry_count in range(max_retries):
             attempt_id = f"{session.session_id}_retry_{retry_count + 1}"
             attempt_start = time.time()
             
             try:
-                # Step 1: Generate corrected command
-                corrected_command = await self._generate_corrected_command(
-                    session.original_error, retry_count
-                )
+                # Step 1: Take the next corrected command
+                corrected_command = candidates[retry_count] if retry_count < len(candidates) else None
                 
                 if not corrected_command:
-                    session.session_log.append(f"Retry {retry_count + 1}: Could not generate corrected command")
+                    self._log(session, f"Retry {retry_count + 1}: Could not generate corrected command")
                     continue
                 
                 # Step 2: Execute corrected command
@@ -405,24 +727,27 @@ class RecoveryWorkflowOrchestrator:
                     success=execution_result.get('success', False),
                     execution_time=time.time() - attempt_start,
                     error_message=execution_result.get('error'),
-                    timestamp=datetime.now()
+                    timestamp=attempt_start
                 )
                 session.attempts.append(attempt)
                 
                 if execution_result.get('success'):
                     session.final_status = RecoveryStatus.SUCCESS
-                    session.session_log.append(f"Command retry successful on attempt {retry_count + 1}")
+                    self._log(session, f"Command retry successful on attempt {retry_count + 1}")
                     return
                 else:
-                    session.session_log.append(f"Retry {retry_count + 1} failed: {execution_result.get('error', 'Unknown error')}")
+                    self._log(session, f"Retry {retry_count + 1} failed: {execution_result.get('error', 'Unknown error')}")
                     
-                    # Wait before next retry (exponential backoff)
+                    # Wait before next retry (capped exponential backoff with
+                    # full jitter so concurrent sessions don't retry in lockstep)
                     if retry_count < max_retries - 1:
-                        wait_time = self.config['exponential_backoff_base'] ** retry_count
+                        backoff = min(self.config['exponential_backoff_base'] ** retry_count,
+                                      self.config.get('max_backoff', 30))
+                        wait_time = random.uniform(0, backoff)
                         await asyncio.sleep(wait_time)
                 
             except Exception as e:
-                session.session_log.append(f"Retry {retry_count + 1} exception: {str(e)}")
+                self._log(session, f"Retry {retry_count + 1} exception: {str(e)}")
                 
                 attempt = RecoveryAttempt(
                     attempt_id=attempt_id,
@@ -432,112 +757,93 @@ class RecoveryWorkflowOrchestrator:
                     success=False,
                     execution_time=time.time() - attempt_start,
                     error_message=str(e),
-                    timestamp=datetime.now()
+                    timestamp=attempt_start
                 )
                 session.attempts.append(attempt)
         
         # All retries failed
         session.final_status = RecoveryStatus.FAILED
-        session.session_log.append(f"All {max_retries} command retries failed")
+        self._log(session, f"All {max_retries} command retries failed")
     
     async def _execute_multi_step_workflow(self, session: RecoverySession):
         """Execute comprehensive multi-step recovery workflow."""
-        session.session_log.append("Starting multi-step recovery workflow")
+        self._log(session, "Starting multi-step recovery workflow")
         
-        # Step 1: Web research
-        session.session_log.append("Step 1: Conducting web research")
-        research_results = await self._conduct_web_research(session.original_error)
+        # Step 1: Web research (alongside code fix preparation when a fix is needed)
+        self._log(session, "Step 1: Conducting web research")
+        fix_context = None
+        if session.original_error.requires_code_fix:
+            research_results, fix_context = await self._research_and_prepare_code_fix(session.original_error)
+        else:
+            research_results = await self._conduct_web_research(session.original_error)
         session.research_results = research_results
         
         # Step 2: Determine next actions based on research
         if session.original_error.requires_code_fix:
-            session.session_log.append("Step 2: Applying code fixes")
-            code_fix_results = await self._apply_code_fixes(session.original_error, research_results)
+            self._log(session, "Step 2: Applying code fixes")
+            code_fix_results = await self._apply_code_fixes(session.original_error, research_results, fix_context)
             
             if code_fix_results.get('success'):
                 session.code_fixes_applied = code_fix_results.get('fixes_applied', [])
                 
                 # Step 3: Retry original command after code fix
-                session.session_log.append("Step 3: Retrying command after code fixes")
+                self._log(session, "Step 3: Retrying command after code fixes")
                 retry_result = await self._execute_corrected_command(session.original_error.context.command)
                 
                 if retry_result.get('success'):
                     session.final_status = RecoveryStatus.SUCCESS
-                    session.session_log.append("Multi-step recovery successful")
+                    self._log(session, "Multi-step recovery successful")
                 else:
                     session.final_status = RecoveryStatus.FAILED
-                    session.session_log.append("Command still fails after code fixes")
+                    self._log(session, "Command still fails after code fixes")
             else:
                 session.final_status = RecoveryStatus.FAILED
-                session.session_log.append("Code fix application failed")
+                self._log(session, "Code fix application failed")
         
         elif session.original_error.requires_command_retry:
             # Try command correction workflow
-            session.session_log.append("Step 2: Attempting command corrections")
-            await self._execute_command_retry_workflow(session)
+            self._log(session, "Step 2: Attempting command corrections")
+            await self._execute_command_retry_workflow(session, research_results)
         
         else:
             # Research-only workflow for complex cases
             if research_results and research_results.get('success'):
                 session.final_status = RecoveryStatus.SUCCESS
-                session.session_log.append("Multi-step recovery completed with research guidance")
+                self._log(session, "Multi-step recovery completed with research guidance")
             else:
                 session.final_status = RecoveryStatus.REQUIRES_MANUAL
                 session.manual_intervention_required = True
-                session.session_log.append("Multi-step recovery requires manual intervention")
+                self._log(session, "Multi-step recovery requires manual intervention")
     
-    async def _execute_manual_intervention_workflow(self, session: RecoverySession):
-        """Execute manual intervention workflow for critical errors."""
-        session.session_log.append("Manual intervention required")
+    async def _execute_manual_intervention_workflow(self, session: RecoverySession,
+                                                    research_results: Optional[Dict[str, Any]] = None):
+        """Execute manual intervention workflow for critical errors, reusing research_results if given."""
+        self._log(session, "Manual intervention required")
         
         # Conduct research to provide guidance
-        research_results = await self._conduct_web_research(session.original_error)
+        if research_results is None:
+            research_results = await self._conduct_web_research(session.original_error)
         session.research_results = research_results
         
         session.final_status = RecoveryStatus.REQUIRES_MANUAL
         session.manual_intervention_required = True
-        session.session_log.append("Recovery workflow completed - manual intervention flagged")
+        self._log(session, "Recovery workflow completed - manual intervention flagged")
     
     async def _conduct_web_research(self, error_analysis: ErrorAnalysis) -> Dict[str, Any]:
-        """Conduct web research for error solutions."""
+        """Conduct web research for error solutions, reusing recent results."""
+        key = self._research_key(error_analysis)
+        
+        cached = self._research_cache.get(key)
+        if cached is not None and time.monotonic() - cached[0] < self.config['research_cache_ttl']:
+            return cached[1]
+        
         try:
-            # Simulate web research (in real implementation, would call WebResearchAgent)
-            self.logger.info(f"🔍 Researching: {error_analysis.research_query}")
-            
-            # Mock research results based on error category
-            if error_analysis.category == ErrorCategory.CODE_ERROR:
-                return {
-                    'success': True,
-                    'solutions': [
-                        "Install missing dependencies",
-                        "Fix syntax errors in code",
-                        "Update import statements"
-                    ],
-                    'documentation_links': [
-                        "https://docs.python.org/3/tutorial/modules.html"
-                    ],
-                    'confidence': 0.8
-                }
-            elif error_analysis.category == ErrorCategory.COMMAND_SYNTAX:
-                return {
-                    'success': True,
-                    'solutions': [
-                        "Check command syntax",
-                        "Verify command options",
-                        "Use correct file paths"
-                    ],
-                    'documentation_links': [
-                        "https://man7.org/linux/man-pages/"
-                    ],
-                    'confidence': 0.7
-                }
-            else:
-                return {
-                    'success': False,
-                    'error': 'No specific solutions found',
-                    'confidence': 0.3
-                }
-                
+            task = self._research_inflight.get(key)
+            if task is None or task.get_loop() is not asyncio.get_running_loop():
+                task = asyncio.ensure_future(self._research_and_cache(key, error_analysis))
+                self._research_inflight[key] = task
+            return await asyncio.shield(task)
+        
         except Exception as e:
             self.logger.error(f"Web research failed: {e}")
             return {
@@ -546,15 +852,130 @@ class RecoveryWorkflowOrchestrator:
                 'confidence': 0.0
             }
     
-    async def _apply_code_fixes(self, error_analysis: ErrorAnalysis, research_results: Dict[str, Any]) -> Dict[str, Any]:
+    @staticmethod
+    def _research_key(error_analysis: ErrorAnalysis) -> str:
+        """Build the research cache key for an error."""
+        signature = f"{error_analysis.category.value}|{error_analysis.primary_message}|{error_analysis.research_query}"
+        return hashlib.blake2b(signature.encode('utf-8'), digest_size=16).hexdigest()
+    
+    async def _research_and_cache(self, key: str, error_analysis: ErrorAnalysis) -> Dict[str, Any]:
+        """Run web research once for a key and cache the results."""
+        try:
+            results = await self._fetch_web_research(error_analysis)
+        finally:
+            if self._research_inflight.get(key) is asyncio.current_task():
+                del self._research_inflight[key]
+        
+        now = time.monotonic()
+        ttl = self.config['research_cache_ttl']
+        cache = self._research_cache
+        cache.pop(key, None)
+        while cache:
+            oldest = next(iter(cache))
+            if now - cache[oldest][0] < ttl:
+                break
+            del cache[oldest]
+        cache[key] = (now, results)
+        return results
+    
+    async def _fetch_web_research(self, error_analysis: ErrorAnalysis) -> Dict[str, Any]:
+        """Fetch web research results for an error."""
+        # Simulate web research (in real implementation, would call WebResearchAgent)
+        self.logger.info(f"🔍 Researching: {error_analysis.research_query}")
+        
+        # Mock research results based on error category
+        if error_analysis.category == ErrorCategory.CODE_ERROR:
+            return {
+                'success': True,
+                'solutions': [
+                    "Install missing dependencies",
+                    "Fix syntax errors in code",
+                    "Update import statements"
+                ],
+                'documentation_links': [
+                    "https://docs.python.org/3/tutorial/modules.html"
+                ],
+                'confidence': 0.8
+            }
+        elif error_analysis.category == ErrorCategory.COMMAND_SYNTAX:
+            return {
+                'success': True,
+                'solutions': [
+                    "Check command syntax",
+                    "Verify command options",
+                    "Use correct file paths"
+                ],
+                'documentation_links': [
+                    "https://man7.org/linux/man-pages/"
+                ],
+                'confidence': 0.7
+            }
+        else:
+            return {
+                'success': False,
+                'error': 'No specific solutions found',
+                'confidence': 0.3
+            }
+    
+    async def _research_and_prepare_code_fix(self, error_analysis: ErrorAnalysis,
+                                             research_results: Optional[Dict[str, Any]] = None
+                                             ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Run web research and code fix preparation concurrently, skipping research if already done."""
+        if research_results is not None:
+            return research_results, await self._prepare_code_fix_context(error_analysis)
+        
+        research_results, fix_context = await asyncio.gather(
+            self._conduct_web_research(error_analysis),
+            self._prepare_code_fix_context(error_analysis),
+            return_exceptions=True
+        )
+        
+        # A research failure should not take the code fix branch down with it
+        if isinstance(research_results, BaseException):
+            self.logger.error(f"Web research failed: {research_results}")
+            research_results = {
+                'success': False,
+                'error': str(research_results),
+                'confidence': 0.0
+            }
+        if isinstance(fix_context, BaseException):
+            raise fix_context
+        
+        return research_results, fix_context
+    
+    async def _prepare_code_fix_context(self, error_analysis: ErrorAnalysis) -> Dict[str, Any]:
+        """Prepare code fix inputs that do not depend on research results."""
+        # Simulate fix preparation (in real implementation, would have CodeEditorAgent
+        # locate and load the affected files)
+        tags = _match_error_patterns(error_analysis.primary_message)
+        
+        if 'module_not_found' in tags:
+            fix_type = 'missing_module'
+        elif 'syntax_error' in tags:
+            fix_type = 'syntax'
+        else:
+            fix_type = None
+        
+        return {
+            'fix_type': fix_type,
+            'command': error_analysis.context.command,
+            'working_directory': error_analysis.context.working_directory
+        }
+    
+    async def _apply_code_fixes(self, error_analysis: ErrorAnalysis, research_results: Dict[str, Any],
+                                fix_context: Dict[str, Any] = None) -> Dict[str, Any]:
         """Apply code fixes using CodeEditorAgent."""
         try:
+            if fix_context is None:
+                fix_context = await self._prepare_code_fix_context(error_analysis)
+            
             # Simulate code fix application (in real implementation, would call CodeEditorAgent)
             self.logger.info("🔧 Applying code fixes")
             
             fixes_applied = []
+            fix_type = fix_context['fix_type']
             
-            if 'ModuleNotFoundError' in error_analysis.primary_message:
+            if fix_type == 'missing_module':
                 # Simulate installing missing module
                 fixes_applied.append("pip install flask")
                 return {
@@ -562,7 +983,7 @@ class RecoveryWorkflowOrchestrator:
                     'fixes_applied': fixes_applied,
                     'modified_files': []
                 }
-            elif 'SyntaxError' in error_analysis.primary_message:
+            elif fix_type == 'syntax':
                 # Simulate syntax fix
                 fixes_applied.append("Fixed syntax error in line 10")
                 return {
@@ -583,13 +1004,22 @@ class RecoveryWorkflowOrchestrator:
                 'error': str(e)
             }
     
-    async def _generate_corrected_command(self, error_analysis: ErrorAnalysis, retry_count: int) -> Optional[str]:
-        """Generate corrected command based on error analysis."""
+    async def _generate_corrected_commands(self, error_analysis: ErrorAnalysis, k: int,
+                                           research_results: Optional[Dict[str, Any]] = None) -> List[Optional[str]]:
+        """
+        Generate up to k corrected commands, one per retry, in a single pass.
+        
+        research_results, when already gathered for this error, is context for
+        the corrections; no new research is done here. A None entry means no
+        correction is available for that retry.
+        """
         try:
             original_command = error_analysis.context.command
+            tags = _match_error_patterns(error_analysis.primary_message)
             
-            # Simple command correction logic (in real implementation, would use EnhancedPromptHandler)
-            if 'command not found' in error_analysis.primary_message:
+            # Simple command correction logic (in real implementation, would ask
+            # EnhancedPromptHandler for the top-k ranked corrections at once)
+            if 'cmd_not_found' in tags:
                 # Try common alternatives
                 command_alternatives = {
                     'ls': ['ls -la', 'dir'],
@@ -598,23 +1028,17 @@ class RecoveryWorkflowOrchestrator:
                 }
                 
                 base_command = original_command.split()[0]
-                if base_command in command_alternatives:
-                    alternatives = command_alternatives[base_command]
-                    if retry_count < len(alternatives):
-                        return alternatives[retry_count]
+                return list(command_alternatives.get(base_command, ())[:k])
             
-            elif 'No such file or directory' in error_analysis.primary_message:
+            elif 'no_such_file' in tags:
                 # Try with different paths
-                if retry_count == 0:
-                    return f"./{original_command}"
-                elif retry_count == 1:
-                    return original_command.replace(' ', ' ./')
+                return [f"./{original_command}", original_command.replace(' ', ' ./')][:k]
             
-            return None
+            return []
             
         except Exception as e:
             self.logger.error(f"Command correction failed: {e}")
-            return None
+            return []
     
     async def _execute_corrected_command(self, command: str) -> Dict[str, Any]:
         """Execute corrected command."""
@@ -655,23 +1079,47 @@ class RecoveryWorkflowOrchestrator:
     
     def get_session(self, session_id: str) -> Optional[RecoverySession]:
         """Get recovery session by ID."""
+        self._evict_expired_sessions()
         return self.active_sessions.get(session_id) or self.completed_sessions.get(session_id)
     
+    async def get_session_record(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a serialized recovery session by ID.
+        
+        Falls back to the session store for sessions run by other
+        processes or evicted from memory.
+        """
+        session = self.get_session(session_id)
+        if session is not None:
+            self._drain_session_logs()
+            return session.to_dict()
+        
+        store = self._get_session_store()
+        if store is None:
+            return None
+        
+        try:
+            record = await store.get(f"recovery:{session_id}")
+        except Exception as e:
+            self.logger.warning(f"Failed to load recovery session {session_id}: {e}")
+            return None
+        return json.loads(record) if record is not None else None
+    
     def get_active_sessions(self) -> List[RecoverySession]:
         """Get all active recovery sessions."""
         return list(self.active_sessions.values())
     
     def get_completed_sessions(self, limit: int = 50) -> List[RecoverySession]:
         """Get recent completed recovery sessions."""
-        sessions = list(self.completed_sessions.values())
-        sessions.sort(key=lambda s: s.session_id, reverse=True)
-        return sessions[:limit]
+        self._evict_expired_sessions()
+        return [session for _, session in itertools.islice(reversed(self._completed_order), limit)]
     
     def get_recovery_statistics(self) -> Dict[str, Any]:
         """Get recovery workflow statistics."""
-        completed = list(self.completed_sessions.values())
+        stats = self._stats
+        total = stats['total']
         
-        if not completed:
+        if not total:
             return {
                 'total_sessions': 0,
                 'success_rate': 0.0,
@@ -679,25 +1127,15 @@ class RecoveryWorkflowOrchestrator:
                 'strategy_success_rates': {}
             }
         
-        successful = [s for s in completed if s.final_status == RecoveryStatus.SUCCESS]
-        
-        strategy_stats = {}
-        for session in completed:
-            strategy = session.recovery_strategy.value
-            if strategy not in strategy_stats:
-                strategy_stats[strategy] = {'total': 0, 'successful': 0}
-            strategy_stats[strategy]['total'] += 1
-            if session.final_status == RecoveryStatus.SUCCESS:
-                strategy_stats[strategy]['successful'] += 1
-        
-        strategy_success_rates = {}
-        for strategy, stats in strategy_stats.items():
-            strategy_success_rates[strategy] = stats['successful'] / stats['total'] if stats['total'] > 0 else 0.0
+        strategy_success_rates = {
+            strategy: counts['successful'] / counts['total']
+            for strategy, counts in stats['per_strategy'].items()
+        }
         
         return {
-            'total_sessions': len(completed),
-            'success_rate': len(successful) / len(completed),
-            'average_time': sum(s.total_time for s in completed) / len(completed),
+            'total_sessions': total,
+            'success_rate': stats['success'] / total,
+            'average_time': stats['total_time'] / total,
             'strategy_success_rates': strategy_success_rates,
             'active_sessions': len(self.active_sessions)
         }
@@ -14,19 +14,196 @@ while intelligently detecting and including only relevant source code files.
 
 import fnmatch
 import hashlib
+import itertools
 import json
 import logging
 import os
 import re
 import time
-from collections import defaultdict
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Tuple, Union, Any
+from typing import Dict, FrozenSet, Iterator, List, Optional, Set, Tuple, Union, Any
 import yaml
 
+try:
+    from yaml import CSafeLoader as _YamlSafeLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlSafeLoader
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import pathspec
+    PATHSPEC_AVAILABLE = True
+except ImportError:
+    PATHSPEC_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# JSON config parser; both accept the raw bytes of the file
+_json_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
+
+# Directories that usually hold source code; traversed before their siblings
+_PRIORITY_DIRS = frozenset({"src", "lib", "app", "packages", "core"})
+
+# "*.ext" globs, which match exactly the names ending in ".ext"
+_EXTENSION_GLOB = re.compile(r"\*\.[^*?\[\]/.]+")
+
+
+def _file_extension(file_name: str) -> str:
+    """Lowercased extension as Path.suffix computes it (none for "foo." or ".bashrc")"""
+    dot = file_name.rfind(".")
+    if 0 < dot < len(file_name) - 1:
+        return file_name[dot:].lower()
+    return ""
+
+
+def _compile_alternation(patterns) -> Optional["re.Pattern"]:
+    """Compile globs into one regex with a capturing group per pattern, tried in order"""
+    if not patterns:
+        return None
+    return re.compile("|".join(f"({fnmatch.translate(os.path.normcase(pattern))})" for pattern in patterns))
+
+
+class _PatternSet:
+    """
+    Ordered glob patterns, split by how cheaply they can be matched.
+    
+    Literal names (node_modules, yarn.lock) are dict lookups, pure extension
+    globs (*.pyc) are a lookup on the name's suffix, and only the remaining
+    globs go through a single compiled regex. Each tier records pattern
+    indices so the earliest matching pattern is still the one reported.
+    """
+    
+    __slots__ = ("patterns", "_literals", "_extensions", "_glob_regex", "_glob_indices", "_name_index")
+    
+    def __init__(self, patterns: Tuple[str, ...]):
+        self.patterns = patterns
+        self._literals = {}
+        self._extensions = {}
+        self._glob_indices = []
+        
+        for index, pattern in enumerate(patterns, 1):
+            pattern = os.path.normcase(pattern)
+            if not any(char in pattern for char in "*?["):
+                self._literals.setdefault(pattern, index)
+            elif _EXTENSION_GLOB.fullmatch(pattern):
+                self._extensions.setdefault(pattern[2:], index)
+            else:
+                self._glob_indices.append(index)
+        
+        self._glob_regex = _compile_alternation([patterns[index - 1] for index in self._glob_indices])
+        
+        # Basenames such as node_modules or __pycache__ recur throughout a tree
+        self._name_index = lru_cache(maxsize=4096)(self._first_index)
+    
+    def _first_index(self, name: str) -> Optional[int]:
+        """Return the 1-based index of the earliest pattern matching name"""
+        name = os.path.normcase(name)
+        best = self._literals.get(name)
+        
+        if self._extensions:
+            _, dot, suffix = name.rpartition(".")
+            if dot:
+                index = self._extensions.get(suffix)
+                if index is not None and (best is None or index < best):
+                    best = index
+        
+        return self._glob_index(name, best)
+    
+    def _glob_index(self, name: str, best: Optional[int]) -> Optional[int]:
+        """Return the earlier of best and the first glob matching an already normcased name"""
+        # Globs listed after the current best cannot change the answer
+        if self._glob_regex is None or (best is not None and best < self._glob_indices[0]):
+            return best
+        
+        match = self._glob_regex.match(name)
+        if match is not None:
+            index = self._glob_indices[match.lastindex - 1]
+            if best is None or index < best:
+                best = index
+        return best
+    
+    def first_match(self, *names: str) -> Optional[str]:
+        """Return the earliest pattern matching any of the names, like fnmatch in a loop"""
+        best = None
+        for name in names:
+            index = self._first_index(name)
+            if index is not None and (best is None or index < best):
+                best = index
+        
+        return self.patterns[best - 1] if best is not None else None
+    
+    def first_match_entry(self, name: str, relative_path: str) -> Optional[str]:
+        """Like first_match(name, relative_path), with the basename lookup memoized"""
+        best = self._name_index(name)
+        
+        # relative_path ends with name, so extension globs give the same answer
+        # for both; only literals and the remaining globs need checking
+        if relative_path != name:
+            relative_path = os.path.normcase(relative_path)
+            index = self._literals.get(relative_path)
+            if index is not None and (best is None or index < best):
+                best = index
+            best = self._glob_index(relative_path, best)
+        
+        return self.patterns[best - 1] if best is not None else None
+
+
+@lru_cache(maxsize=64)
+def _compile_pattern_set(patterns: Tuple[str, ...]) -> _PatternSet:
+    """Compile (and cache) a pattern set"""
+    return _PatternSet(patterns)
+
+
+@lru_cache(maxsize=64)
+def _compile_memignore_spec(patterns: Tuple[str, ...]) -> Optional["pathspec.PathSpec"]:
+    """Compile (and cache) .memignore lines into a gitignore-style matcher"""
+    try:
+        return pathspec.PathSpec.from_lines('gitwildmatch', patterns)
+    except Exception as e:
+        logger.warning(f"Invalid .memignore patterns, falling back to fnmatch: {e}")
+        return None
+
+
+def _match_memignore(patterns: Tuple[str, ...], name: str, relative_path: str,
+                     is_dir: bool = False) -> Optional[str]:
+    """
+    Return the .memignore pattern that excludes a path, if any.
+    
+    With pathspec installed, patterns follow .gitignore semantics (**,
+    !negation, dir-only trailing /) and the last matching pattern decides.
+    Otherwise each pattern is an fnmatch glob tried against both the name
+    and the relative path.
+    """
+    spec = _compile_memignore_spec(patterns) if PATHSPEC_AVAILABLE and patterns else None
+    if spec is None:
+        pattern_set = _compile_pattern_set(patterns)
+        if is_dir:
+            return pattern_set.first_match_entry(name, relative_path)
+        return pattern_set.first_match(relative_path, name)
+    
+    relative_path = relative_path.replace(os.sep, "/")
+    if is_dir:
+        relative_path += "/"
+    if not spec.match_file(relative_path):
+        return None
+    
+    # Only excluded paths get here; report the pattern that decided it
+    for line, pattern in zip(reversed(patterns), reversed(spec.patterns)):
+        if pattern.include and pattern.regex.match(relative_path):
+            return line
+    return None
+
+
 @dataclass
 class ProjectLanguageHints:
     """Detected project language configuration hints"""
@@ -43,8 +220,19 @@ class FilteringStats:
     total_files_excluded: int = 0
     total_size_included: int = 0
     total_size_excluded: int = 0
-    exclusion_reasons: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
-    language_breakdown: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    exclusion_reasons: Dict[str, int] = field(default_factory=Counter)
+    language_breakdown: Dict[str, int] = field(default_factory=Counter)
+    
+    def __iadd__(self, other: "FilteringStats") -> "FilteringStats":
+        """Merge another set of statistics into this one"""
+        self.total_files_found += other.total_files_found
+        self.total_files_included += other.total_files_included
+        self.total_files_excluded += other.total_files_excluded
+        self.total_size_included += other.total_size_included
+        self.total_size_excluded += other.total_size_excluded
+        self.exclusion_reasons.update(other.exclusion_reasons)
+        self.language_breakdown.update(other.language_breakdown)
+        return self
     
 class CodebaseFilter:
     """
@@ -63,6 +251,12 @@ class CodebaseFilter:
         self.stats = FilteringStats()
         self._language_hints = None
         self._exclusion_cache = {}
+        self._compile_patterns()
+    
+    def _compile_patterns(self):
+        """Precompile the configured exclusion patterns"""
+        self._excluded_dir_patterns = _compile_pattern_set(tuple(self.config["excluded_directories"]))
+        self._excluded_file_patterns = _compile_pattern_set(tuple(self.config["excluded_file_patterns"]))
         
     def _load_config(self, config_path: Optional[str]) -> Dict[str, Any]:
         """Load filtering configuration from file or use defaults"""
@@ -187,23 +381,36 @@ class CodebaseFilter:
             # Performance settings
             "enable_size_warnings": True,
             "enable_file_hashing": False,  # For duplicate detection
-            "max_depth": 10  # Maximum directory traversal depth
+            "max_depth": 10,  # Maximum directory traversal depth
+            "track_excluded_size": False,  # Stat excluded files to report their total size
+            "max_scan_workers": None,  # Threads scanning top-level subtrees (default: min(32, 4 * CPUs))
+            "cache_dir": os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+                                      "codebase_filter")  # Filtering results keyed by root and config
         }
         
-        if config_path and Path(config_path).exists():
+        if config_path:
             try:
-                with open(config_path, 'r') as f:
-                    if config_path.endswith('.yaml') or config_path.endswith('.yml'):
-                        user_config = yaml.safe_load(f)
-                    else:
-                        user_config = json.load(f)
+                with open(config_path, 'rb') as f:
+                    data = f.read()
+                
+                if config_path.endswith('.yaml') or config_path.endswith('.yml'):
+                    user_config = yaml.load(data, Loader=_YamlSafeLoader)
+                else:
+                    user_config = _json_loads(data)
                 
                 # Merge user config with defaults
                 default_config.update(user_config)
                 logger.info(f"Loaded filtering config from {config_path}")
+            except FileNotFoundError:
+                pass  # No config file; use defaults
             except Exception as e:
                 logger.warning(f"Failed to load config from {config_path}: {e}")
         
+        # Drop repeated patterns (the defaults list some directories twice),
+        # keeping first occurrences so exclusion reasons are unchanged
+        for key in ("excluded_directories", "excluded_file_patterns"):
+            default_config[key] = list(dict.fromkeys(default_config[key]))
+        
         return default_config
     
     def detect_project_languages(self, project_root: Union[str, Path]) -> ProjectLanguageHints:
@@ -257,7 +464,7 @@ class CodebaseFilter:
         self._language_hints = hints
         return hints
     
-    def get_allowed_extensions(self, languages: Optional[Set[str]] = None) -> Set[str]:
+    def get_allowed_extensions(self, languages: Optional[Set[str]] = None) -> FrozenSet[str]:
         """Get allowed file extensions based on detected or specified languages"""
         
         if languages is None:
@@ -276,7 +483,7 @@ class CodebaseFilter:
         allowed_extensions.update(self.config["source_extensions"]["config"])
         allowed_extensions.update(self.config["source_extensions"]["docs"])
         
-        return allowed_extensions
+        return frozenset(allowed_extensions)
     
     def load_memignore(self, project_root: Union[str, Path]) -> List[str]:
         """Load .memignore file patterns if it exists"""
@@ -292,38 +499,68 @@ class CodebaseFilter:
                         if line and not line.startswith('#'):
                             patterns.append(line)
                 
+                if PATHSPEC_AVAILABLE:
+                    _compile_memignore_spec(tuple(patterns))
+                else:
+                    _compile_pattern_set(tuple(patterns))
                 logger.info(f"Loaded {len(patterns)} patterns from .memignore")
             except Exception as e:
                 logger.warning(f"Failed to load .memignore: {e}")
         
         return patterns
     
-    def should_exclude_directory(self, dir_path: Path, project_root: Path, 
-                                memignore_patterns: List[str]) -> Tuple[bool, str]:
-        """Check if directory should be excluded"""
+    def should_exclude_directory(self, dir_path: Union[Path, os.DirEntry], project_root: Path, 
+                                memignore_patterns: List[str],
+                                root_prefix_len: Optional[int] = None) -> Tuple[bool, str]:
+        """
+        Check if directory should be excluded (accepts a Path or an os.DirEntry).
+        
+        root_prefix_len, the length of project_root with its trailing separator,
+        lets the relative path be sliced from the full path instead of going
+        through Path.relative_to.
+        """
         
         dir_name = dir_path.name
-        relative_path = str(dir_path.relative_to(project_root))
+        if root_prefix_len is None:
+            relative_path = str(Path(dir_path).relative_to(project_root))
+        else:
+            relative_path = os.fspath(dir_path)[root_prefix_len:]
         
         # Check against excluded directories
-        for pattern in self.config["excluded_directories"]:
-            if fnmatch.fnmatch(dir_name, pattern) or fnmatch.fnmatch(relative_path, pattern):
-                return True, f"excluded_directory:{pattern}"
+        pattern = self._excluded_dir_patterns.first_match_entry(dir_name, relative_path)
+        if pattern is not None:
+            return True, f"excluded_directory:{pattern}"
         
         # Check against .memignore patterns
-        for pattern in memignore_patterns:
-            if fnmatch.fnmatch(relative_path, pattern) or fnmatch.fnmatch(dir_name, pattern):
-                return True, f"memignore:{pattern}"
+        pattern = _match_memignore(tuple(memignore_patterns), dir_name, relative_path, is_dir=True)
+        if pattern is not None:
+            return True, f"memignore:{pattern}"
         
         return False, ""
     
-    def should_exclude_file(self, file_path: Path, project_root: Path,
-                           allowed_extensions: Set[str], memignore_patterns: List[str]) -> Tuple[bool, str]:
-        """Check if file should be excluded"""
+    def should_exclude_file(self, file_path: Union[Path, os.DirEntry], project_root: Path,
+                           allowed_extensions: FrozenSet[str], memignore_patterns: List[str],
+                           file_ext: Optional[str] = None,
+                           root_prefix_len: Optional[int] = None) -> Tuple[bool, str]:
+        """
+        Check if file should be excluded (accepts a Path or a cached-stat os.DirEntry).
+        
+        file_ext and root_prefix_len may be passed precomputed, as in
+        should_exclude_directory.
+        """
         
         file_name = file_path.name
-        file_ext = file_path.suffix.lower()
-        relative_path = str(file_path.relative_to(project_root))
+        if file_ext is None:
+            file_ext = _file_extension(file_name)
+        
+        # Check extension allowlist first; it needs no syscall and rejects most files
+        if file_ext and file_ext not in allowed_extensions:
+            return True, f"extension_not_allowed:{file_ext}"
+        
+        if root_prefix_len is None:
+            relative_path = str(Path(file_path).relative_to(project_root))
+        else:
+            relative_path = os.fspath(file_path)[root_prefix_len:]
         
         # Check file size
         try:
@@ -334,28 +571,43 @@ class CodebaseFilter:
             return True, "stat_error"
         
         # Check against excluded file patterns
-        for pattern in self.config["excluded_file_patterns"]:
-            if fnmatch.fnmatch(file_name, pattern) or fnmatch.fnmatch(relative_path, pattern):
-                return True, f"excluded_pattern:{pattern}"
-        
-        # Check extension allowlist
-        if file_ext and file_ext not in allowed_extensions:
-            return True, f"extension_not_allowed:{file_ext}"
+        pattern = self._excluded_file_patterns.first_match(file_name, relative_path)
+        if pattern is not None:
+            return True, f"excluded_pattern:{pattern}"
         
         # Check against .memignore patterns
-        for pattern in memignore_patterns:
-            if fnmatch.fnmatch(relative_path, pattern) or fnmatch.fnmatch(file_name, pattern):
-                return True, f"memignore:{pattern}"
+        pattern = _match_memignore(tuple(memignore_patterns), file_name, relative_path)
+        if pattern is not None:
+            return True, f"memignore:{pattern}"
         
         return False, ""
     
     def filter_codebase_files(self, project_root: Union[str, Path],
-                             custom_languages: Optional[Set[str]] = None) -> List[Path]:
+                             custom_languages: Optional[Set[str]] = None,
+                             no_cache: bool = False) -> List[Path]:
         """
         Main entry point: Filter codebase files intelligently.
         
+        Results are cached on disk and reused while no scanned directory has
+        changed (files added, removed or renamed) and every included or
+        oversized file keeps its size and mtime; pass no_cache=True to force
+        a fresh scan.
+        
         Returns list of file paths that should be loaded into MemOS.
         """
+        return [Path(file_path) for file_path, _, _ in
+                self.iter_codebase_files(project_root, custom_languages, no_cache)]
+    
+    def iter_codebase_files(self, project_root: Union[str, Path],
+                            custom_languages: Optional[Set[str]] = None,
+                            no_cache: bool = False) -> Iterator[Tuple[str, int, str]]:
+        """
+        Stream included files as (path, size, extension) tuples.
+        
+        Paths are plain strings so callers can pipeline files into loading or
+        embedding as they are found without building Path objects. Stats are
+        complete, and the result is cached, once the iterator is exhausted.
+        """
         
         root_path = Path(project_root).resolve()
         if not root_path.exists():
@@ -380,85 +632,324 @@ class CodebaseFilter:
         logger.info(f"📁 Allowed extensions: {sorted(allowed_extensions)}")
         logger.info(f"🚫 Exclusion patterns: {len(memignore_patterns)} custom + {len(self.config['excluded_directories'])} default dirs")
         
-        # Traverse and filter files
-        included_files = []
+        # Reuse the cached result if no scanned directory or sized file changed since
+        cache_key = None
+        dir_mtimes = None
+        file_sigs = None
+        if not no_cache:
+            cache_key = self._cache_key(root_path, allowed_extensions, memignore_patterns)
+            cached_files = self._load_cached_result(cache_key)
+            if cached_files is not None:
+                logger.info(f"♻️  Using cached filtering result: {len(cached_files):,} files "
+                            f"({time.time() - start_time:.2f}s)")
+                yield from cached_files
+                return
+            dir_mtimes = {}
+            file_sigs = {}
+        
+        # Traverse and filter files; top-level subtrees are scanned on worker
+        # threads and merged in traversal order so limits apply deterministically
+        cached_files = [] if cache_key is not None else None
         total_size = 0
         
-        for root, dirs, files in os.walk(root_path):
-            current_dir = Path(root)
-            depth = len(current_dir.relative_to(root_path).parts)
-            
-            # Check depth limit
-            if depth > self.config["max_depth"]:
-                dirs.clear()  # Stop descending
-                continue
-            
-            # Filter directories in-place to prevent traversal
-            dirs_to_remove = []
-            for dir_name in dirs:
-                dir_path = current_dir / dir_name
-                should_exclude, reason = self.should_exclude_directory(dir_path, root_path, memignore_patterns)
-                
-                if should_exclude:
-                    dirs_to_remove.append(dir_name)
-                    self.stats.exclusion_reasons[reason] += 1
-                    logger.debug(f"Excluding directory: {dir_path} ({reason})")
-            
-            # Remove excluded directories
-            for dir_name in dirs_to_remove:
-                dirs.remove(dir_name)
-            
-            # Check files per directory limit
-            if len(files) > self.config["max_files_per_dir"]:
-                logger.warning(f"🚨 Directory {current_dir} has {len(files)} files (limit: {self.config['max_files_per_dir']})")
-                if self.config["enable_size_warnings"]:
-                    files = files[:self.config["max_files_per_dir"]]  # Truncate
+        root_files, subdirs = self._list_directory(root_path, root_path, memignore_patterns, self.stats, dir_mtimes)
+        root_scan = [(root_path, self._classify_files(root_path, root_files, root_path,
+                                                      allowed_extensions, memignore_patterns))]
+        if self.config["max_depth"] < 1:
+            subdirs = []
+        
+        # Per-file tallies stay in locals and are folded into stats once
+        max_total_size = self.config["max_total_size"]
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
+        files_found = files_excluded = files_included = 0
+        size_excluded = 0
+        exclusion_reasons = Counter()
+        language_breakdown = Counter()
+        
+        max_workers = self.config.get("max_scan_workers") or min(32, (os.cpu_count() or 1) * 4)
+        executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(subdirs))))
+        try:
+            subtree_scans = executor.map(
+                lambda subdir: self._scan_subtree(subdir, 1, root_path, allowed_extensions,
+                                                  memignore_patterns, dir_mtimes),
+                subdirs
+            )
             
-            # Process files in current directory
-            for file_name in files:
-                file_path = current_dir / file_name
-                self.stats.total_files_found += 1
+            size_limit_hit = False
+            for scanned, subtree_stats in itertools.chain([(root_scan, None)], subtree_scans):
+                if subtree_stats is not None:
+                    self.stats += subtree_stats
                 
-                try:
-                    should_exclude, reason = self.should_exclude_file(
-                        file_path, root_path, allowed_extensions, memignore_patterns
-                    )
-                    
-                    if should_exclude:
-                        self.stats.total_files_excluded += 1
-                        self.stats.exclusion_reasons[reason] += 1
-                        try:
-                            self.stats.total_size_excluded += file_path.stat().st_size
-                        except OSError:
-                            pass
-                        continue
+                for current_dir, records in scanned:
+                    # Process files in current directory
+                    for entry, file_ext, should_exclude, reason, file_size in records:
+                        files_found += 1
+                        
+                        if should_exclude:
+                            files_excluded += 1
+                            exclusion_reasons[reason] += 1
+                            if file_size is not None:
+                                size_excluded += file_size
+                            # A shrinking file can drop under max_file_size in place
+                            if file_sigs is not None and reason.startswith("oversized:"):
+                                stat_result = entry.stat()
+                                file_sigs[entry.path] = (stat_result.st_size, stat_result.st_mtime_ns)
+                            continue
+                        
+                        # File is included
+                        if file_size is None:
+                            logger.warning(f"Error processing file {entry.path}: stat failed")
+                            exclusion_reasons["os_error"] += 1
+                            continue
+                        
+                        # Check total size limit
+                        if total_size + file_size > max_total_size:
+                            logger.warning(f"🚨 Total size limit reached ({max_total_size} bytes)")
+                            size_limit_hit = True
+                            break
+                        
+                        files_included += 1
+                        language_breakdown[file_ext] += 1
+                        total_size += file_size
+                        
+                        if debug_enabled:
+                            logger.debug("Including file: %s (%d bytes)", entry.path, file_size)
+                        
+                        included = (entry.path, file_size, file_ext)
+                        if cached_files is not None:
+                            cached_files.append(included)
+                            # DirEntry reuses the stat that produced file_size
+                            file_sigs[entry.path] = (file_size, entry.stat().st_mtime_ns)
+                        yield included
                     
-                    # File is included
-                    file_size = file_path.stat().st_size
-                    file_ext = file_path.suffix.lower()
-                    
-                    # Check total size limit
-                    if total_size + file_size > self.config["max_total_size"]:
-                        logger.warning(f"🚨 Total size limit reached ({self.config['max_total_size']} bytes)")
+                    if size_limit_hit:
                         break
-                    
-                    included_files.append(file_path)
-                    self.stats.total_files_included += 1
-                    self.stats.total_size_included += file_size
-                    self.stats.language_breakdown[file_ext] += 1
-                    total_size += file_size
-                    
-                    logger.debug(f"Including file: {file_path} ({file_size} bytes)")
-                    
-                except OSError as e:
-                    logger.warning(f"Error processing file {file_path}: {e}")
-                    self.stats.exclusion_reasons["os_error"] += 1
+                
+                # Nothing more can be included; stop walking the tree
+                if size_limit_hit:
+                    break
+        finally:
+            # Drop subtrees still queued after the size limit or an early stop by the consumer
+            executor.shutdown(wait=True, cancel_futures=True)
+            self.stats += FilteringStats(
+                total_files_found=files_found,
+                total_files_included=files_included,
+                total_files_excluded=files_excluded,
+                total_size_included=total_size,
+                total_size_excluded=size_excluded,
+                exclusion_reasons=exclusion_reasons,
+                language_breakdown=language_breakdown
+            )
+        
+        if cache_key is not None:
+            self._save_cached_result(cache_key, cached_files, dir_mtimes, file_sigs)
         
         # Log comprehensive results
         elapsed = time.time() - start_time
         self._log_filtering_results(elapsed, root_path)
+    
+    def _cache_key(self, root_path: Path, allowed_extensions: FrozenSet[str],
+                   memignore_patterns: List[str]) -> str:
+        """Build the result cache key from everything that shapes the result besides the tree"""
+        key_source = json.dumps({
+            "root": str(root_path),
+            "config": self.config,
+            "allowed_extensions": sorted(allowed_extensions),
+            "memignore": memignore_patterns
+        }, sort_keys=True, default=str)
+        return hashlib.blake2b(key_source.encode("utf-8"), digest_size=16).hexdigest()
+    
+    def _load_cached_result(self, cache_key: str) -> Optional[List[Tuple[str, int, str]]]:
+        """Load a cached result if every directory it scanned and every file it sized is unchanged"""
+        cache_path = Path(self.config["cache_dir"]) / f"{cache_key}.json"
+        try:
+            with open(cache_path, "r") as f:
+                cached = json.load(f)
+            
+            for dir_path, mtime_ns in cached["sig"].items():
+                if os.stat(dir_path).st_mtime_ns != mtime_ns:
+                    return None
+            
+            # In-place writes don't touch the directory mtime, so check sized files too
+            for file_path, (file_size, mtime_ns) in cached["file_sig"].items():
+                stat_result = os.stat(file_path)
+                if stat_result.st_size != file_size or stat_result.st_mtime_ns != mtime_ns:
+                    return None
+            
+            stats = FilteringStats()
+            for name, value in cached["stats"].items():
+                if isinstance(value, dict):
+                    getattr(stats, name).update(value)
+                else:
+                    setattr(stats, name, value)
+            
+            files = [(file_path, file_size, file_ext) for file_path, file_size, file_ext in cached["files"]]
+        except (OSError, ValueError, KeyError, AttributeError, TypeError):
+            return None
+        
+        self.stats = stats
+        return files
+    
+    def _save_cached_result(self, cache_key: str, included_files: List[Tuple[str, int, str]],
+                            dir_mtimes: Dict[str, int], file_sigs: Dict[str, Tuple[int, int]]):
+        """Write a filtering result and its directory and file signatures to the cache"""
+        cache_dir = Path(self.config["cache_dir"])
+        cached = {
+            "files": included_files,
+            "sig": dir_mtimes,
+            "file_sig": file_sigs,
+            "stats": {
+                "total_files_found": self.stats.total_files_found,
+                "total_files_included": self.stats.total_files_included,
+                "total_files_excluded": self.stats.total_files_excluded,
+                "total_size_included": self.stats.total_size_included,
+                "total_size_excluded": self.stats.total_size_excluded,
+                "exclusion_reasons": dict(self.stats.exclusion_reasons),
+                "language_breakdown": dict(self.stats.language_breakdown)
+            }
+        }
+        
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_dir / f"{cache_key}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(cached, f)
+            os.replace(tmp_path, cache_dir / f"{cache_key}.json")
+        except OSError as e:
+            logger.warning(f"Failed to write filtering cache: {e}")
+    
+    def clear_cache(self):
+        """Remove all cached filtering results"""
+        cache_dir = Path(self.config["cache_dir"])
+        if not cache_dir.is_dir():
+            return
+        
+        for cache_path in cache_dir.glob("*.json"):
+            try:
+                cache_path.unlink()
+            except OSError as e:
+                logger.warning(f"Failed to remove cache file {cache_path}: {e}")
+    
+    def _scan_subtree(self, dir_path: Path, depth: int, project_root: Path, allowed_extensions: FrozenSet[str],
+                      memignore_patterns: List[str],
+                      dir_mtimes: Optional[Dict[str, int]] = None) -> Tuple[List[Tuple[Path, List[tuple]]], FilteringStats]:
+        """
+        Scan and classify every file in a subtree; runs on a worker thread.
         
-        return included_files
+        Returns the classified files per directory in traversal order, plus
+        the subtree's directory exclusion statistics.
+        """
+        stats = FilteringStats()
+        scanned = [
+            (current_dir, self._classify_files(current_dir, files, project_root,
+                                               allowed_extensions, memignore_patterns))
+            for current_dir, files in self._scandir_recursive(dir_path, depth, project_root,
+                                                              memignore_patterns, stats, dir_mtimes)
+        ]
+        return scanned, stats
+    
+    def _classify_files(self, dir_path: Path, files: List[os.DirEntry], project_root: Path,
+                        allowed_extensions: FrozenSet[str], memignore_patterns: List[str]) -> List[tuple]:
+        """Classify a directory's files as (entry, extension, excluded, reason, size or None)"""
+        
+        # Check files per directory limit
+        max_files_per_dir = self.config["max_files_per_dir"]
+        if len(files) > max_files_per_dir:
+            logger.warning(f"🚨 Directory {dir_path} has {len(files)} files (limit: {max_files_per_dir})")
+            if self.config["enable_size_warnings"]:
+                files = files[:max_files_per_dir]  # Truncate
+        
+        track_excluded_size = self.config["track_excluded_size"]
+        should_exclude_file = self.should_exclude_file
+        root_prefix_len = len(os.path.join(project_root, ""))
+        records = []
+        for entry in files:
+            file_ext = _file_extension(entry.name)
+            should_exclude, reason = should_exclude_file(
+                entry, project_root, allowed_extensions, memignore_patterns, file_ext, root_prefix_len
+            )
+            
+            # Most excluded files never reach the size check; only stat them
+            # when their size is tracked. Otherwise DirEntry reuses that stat.
+            file_size = None
+            if not should_exclude or track_excluded_size:
+                try:
+                    file_size = entry.stat().st_size
+                except OSError:
+                    pass
+            
+            records.append((entry, file_ext, should_exclude, reason, file_size))
+        
+        return records
+    
+    def _list_directory(self, dir_path: Path, project_root: Path, memignore_patterns: List[str],
+                        stats: FilteringStats,
+                        dir_mtimes: Optional[Dict[str, int]] = None) -> Tuple[List[os.DirEntry], List[Path]]:
+        """
+        List a directory's file entries and the subdirectories to descend into.
+        
+        Excluded directories are counted in stats, and the directory's mtime is
+        recorded in dir_mtimes when given. Like os.walk, symlinked directories
+        are checked but not descended into, and unreadable directories are
+        treated as empty. Subdirectories are ordered with _PRIORITY_DIRS first,
+        then by name.
+        
+        Uses os.scandir rather than os.fwalk: DirEntry already knows each
+        entry's type from the listing and caches its one stat, while fwalk is
+        built on scandir and adds an open/close per directory.
+        """
+        try:
+            if dir_mtimes is not None:
+                dir_mtimes[str(dir_path)] = os.stat(dir_path).st_mtime_ns
+            
+            with os.scandir(dir_path) as it:
+                entries = list(it)
+        except OSError:
+            return [], []
+        
+        root_prefix_len = len(os.path.join(project_root, ""))
+        subdirs = []
+        files = []
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            
+            if not is_dir:
+                files.append(entry)
+                continue
+            
+            # Filter directories before descending
+            should_exclude, reason = self.should_exclude_directory(entry, project_root, memignore_patterns,
+                                                                   root_prefix_len)
+            if should_exclude:
+                stats.exclusion_reasons[reason] += 1
+                logger.debug("Excluding directory: %s (%s)", entry.path, reason)
+            elif not entry.is_symlink():
+                subdirs.append(Path(entry.path))
+        
+        # Visit likely source directories first so size cutoffs keep the useful files
+        subdirs.sort(key=lambda subdir: (subdir.name not in _PRIORITY_DIRS, subdir.name.lower()))
+        
+        return files, subdirs
+    
+    def _scandir_recursive(self, dir_path: Path, depth: int, project_root: Path, memignore_patterns: List[str],
+                           stats: FilteringStats,
+                           dir_mtimes: Optional[Dict[str, int]] = None) -> Iterator[Tuple[Path, List[os.DirEntry]]]:
+        """
+        Walk a directory tree top-down with os.scandir, pruning excluded directories.
+        
+        Yields (directory, file entries) for every directory within max_depth.
+        """
+        files, subdirs = self._list_directory(dir_path, project_root, memignore_patterns, stats, dir_mtimes)
+        yield dir_path, files
+        
+        # Check depth limit before descending
+        if depth < self.config["max_depth"]:
+            for subdir_path in subdirs:
+                yield from self._scandir_recursive(subdir_path, depth + 1, project_root, memignore_patterns,
+                                                   stats, dir_mtimes)
     
     def _log_filtering_results(self, elapsed_time: float, project_root: Path):
         """Log comprehensive filtering results and statistics"""
@@ -472,7 +963,8 @@ class CodebaseFilter:
         logger.info(f"✅ Files included: {self.stats.total_files_included:,}")
         logger.info(f"🚫 Files excluded: {self.stats.total_files_excluded:,}")
         logger.info(f"💾 Total size included: {self.stats.total_size_included / 1024 / 1024:.1f} MB")
-        logger.info(f"🗑️  Total size excluded: {self.stats.total_size_excluded / 1024 / 1024:.1f} MB")
+        if self.config["track_excluded_size"]:
+            logger.info(f"🗑️  Total size excluded: {self.stats.total_size_excluded / 1024 / 1024:.1f} MB")
         
         if self.stats.exclusion_reasons:
             logger.info("\n🚫 Exclusion breakdown:")
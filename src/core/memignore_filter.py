@@ -14,10 +14,14 @@ Key Features:
 
 import logging
 import os
+import re
 import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Tuple, Union, Any
+from typing import Dict, Iterator, List, Optional, Set, Tuple, Union, Any
 
 try:
     import pathspec
@@ -28,6 +32,149 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+
+@lru_cache(maxsize=64)
+def _read_memignore(memignore_path: str, mtime_ns: int, size: int) -> Tuple[str, ...]:
+    """Read (and cache) a .memignore file's patterns; mtime and size key out stale entries"""
+    return tuple(_parse_memignore_text(Path(memignore_path).read_text(encoding='utf-8')))
+
+
+def _parse_memignore_text(text: str) -> List[str]:
+    """Return the patterns in .memignore text, skipping empty lines and comments"""
+    return [line for raw_line in text.splitlines()
+            if (line := raw_line.strip()) and not line.startswith('#')]
+
+
+# Named groups in pathspec's per-pattern regexes; they would clash once combined
+_NAMED_GROUP = re.compile(r"(?<!\\)\(\?P<\w+>")
+
+# Patterns matched without regex: plain names (optionally dir-only) and "*.ext"
+_LITERAL_NAME = re.compile(r"[\w.-]+/?")
+_EXTENSION_GLOB = re.compile(r"\*\.[A-Za-z0-9]+")
+
+
+class _CompiledMemignore:
+    """
+    A PathSpec compiled for fast repeated matching.
+    
+    PathSpec.match_file tries each pattern's regex in turn. Here plain names
+    (node_modules/, .coverage) and extension globs (*.pyc) become dict lookups
+    on each path component, and the remaining patterns are groups of a single
+    regex listed last pattern first. Every hit carries its pattern index, so
+    the last matching pattern still decides, as in .gitignore, and its
+    include flag says whether it excludes or re-includes.
+    """
+    
+    def __init__(self, spec: "pathspec.PathSpec", lines: List[str]):
+        self.spec = spec
+        self._fallback = False
+        
+        # Specs are cached per pattern list, so rescans of a project (watch
+        # mode, reindexing) test the same paths against the same instance
+        self.match_file = lru_cache(maxsize=65536)(self._match_file)
+        
+        self._names = {}       # name -> (index, include)
+        self._dir_names = {}   # name -> (index, include), for "name/" patterns
+        self._extensions = {}  # extension -> (index, include), for "*.ext" patterns
+        self._groups = {}      # regex group -> (index, include)
+        self._regex = None
+        self._regex_max_index = 0
+        
+        # Directory names excluded whatever their path, mapped to whether the
+        # path without a trailing slash matches too (plain names) or may not
+        # (dir-only names); the walk prunes these without matching
+        self.prune_names = {}
+        
+        alternatives = []
+        group = 1
+        last_negation = 0
+        # spec.patterns holds one pattern per non-empty line
+        indexed = list(enumerate(zip(lines, spec.patterns), 1))
+        for index, (line, pattern) in reversed(indexed):
+            if pattern.include is None:
+                continue  # Comments
+            if not pattern.include:
+                last_negation = max(last_negation, index)
+            
+            body = line[1:] if line.startswith("!") else line
+            if _LITERAL_NAME.fullmatch(body) and body.rstrip("/").strip("."):
+                table = self._dir_names if body.endswith("/") else self._names
+                table.setdefault(body.rstrip("/"), (index, pattern.include))
+                continue
+            if _EXTENSION_GLOB.fullmatch(body):
+                self._extensions.setdefault(body[2:], (index, pattern.include))
+                continue
+            
+            if pattern.regex.flags & ~re.UNICODE:
+                self._fallback = True  # Cannot share one regex; keep matching through the spec
+                return
+            
+            source = _NAMED_GROUP.sub("(?:", pattern.regex.pattern)
+            if not source.startswith("^"):
+                source = f"[\\s\\S]*?(?:{source})"  # Patterns are searched for, not matched
+            alternatives.append(f"({source})")
+            self._groups[group] = (index, pattern.include)
+            self._regex_max_index = max(self._regex_max_index, index)
+            group += 1 + re.compile(source).groups
+        
+        if alternatives:
+            self._regex = re.compile("|".join(alternatives))
+        
+        # A later negation could re-include any path, so only names listed
+        # after the last one are certain to be excluded
+        for table, matches_without_slash in ((self._dir_names, False), (self._names, True)):
+            for name, (index, include) in table.items():
+                if include and index > last_negation:
+                    self.prune_names[name] = matches_without_slash
+    
+    def _match_file(self, file: str) -> bool:
+        """Return whether the patterns exclude a project-relative path, like PathSpec.match_file"""
+        if self._fallback:
+            return self.spec.match_file(file)
+        
+        if os.sep != "/":
+            file = file.replace(os.sep, "/")
+        
+        # Names match any component (so an ancestor), dir-only names any
+        # component followed by a slash; keep the highest-indexed hit
+        best, include = 0, False
+        parts = file.split("/")
+        last = len(parts) - 1
+        for position, part in enumerate(parts):
+            if not part:
+                continue
+            
+            hit = self._names.get(part)
+            if hit is not None and hit[0] > best:
+                best, include = hit
+            if position < last:
+                hit = self._dir_names.get(part)
+                if hit is not None and hit[0] > best:
+                    best, include = hit
+            if self._extensions:
+                _, dot, extension = part.rpartition(".")
+                hit = self._extensions.get(extension) if dot else None
+                if hit is not None and hit[0] > best:
+                    best, include = hit
+        
+        # Only a regex pattern listed after the best hit can change the outcome
+        if self._regex is not None and best < self._regex_max_index:
+            match = self._regex.match(file)
+            if match is not None:
+                index, match_include = self._groups[match.lastindex]
+                if index > best:
+                    include = match_include
+        
+        return include
+
+
+@lru_cache(maxsize=64)
+def _compile_pathspec(patterns: Tuple[str, ...]) -> _CompiledMemignore:
+    """Compile (and cache) a pattern list, so rescans of a project reuse its spec"""
+    spec = pathspec.PathSpec.from_lines('gitwildmatch', patterns)
+    return _CompiledMemignore(spec, [line for line in patterns if line])
+
+
 @dataclass
 class FilteringStats:
     """Statistics from .memignore filtering operation"""
@@ -36,9 +183,19 @@ class FilteringStats:
     total_files_excluded: int = 0
     total_size_included: int = 0
     total_size_excluded: int = 0
-    exclusion_reasons: Dict[str, int] = field(default_factory=dict)
+    exclusion_reasons: Dict[str, int] = field(default_factory=Counter)
     memignore_patterns_used: List[str] = field(default_factory=list)
     processing_time_seconds: float = 0.0
+    
+    def __iadd__(self, other: "FilteringStats") -> "FilteringStats":
+        """Merge another walk's file counts, sizes and exclusion reasons into this one"""
+        self.total_files_found += other.total_files_found
+        self.total_files_included += other.total_files_included
+        self.total_files_excluded += other.total_files_excluded
+        self.total_size_included += other.total_size_included
+        self.total_size_excluded += other.total_size_excluded
+        self.exclusion_reasons.update(other.exclusion_reasons)
+        return self
 
 class MemignoreFilter:
     """
@@ -48,8 +205,9 @@ class MemignoreFilter:
     when loading codebases into memory, without complex universal filtering.
     """
     
-    def __init__(self):
+    def __init__(self, max_workers: Optional[int] = None):
         self.stats = FilteringStats()
+        self.max_workers = max_workers  # Threads walking top-level subtrees (default: min(32, 4 * CPUs))
         self._pathspec = None
         self._memignore_path = None
         
@@ -81,14 +239,16 @@ class MemignoreFilter:
         patterns = []
         memignore_exists = False
         
-        if memignore_path.exists():
+        try:
+            memignore_stat = memignore_path.stat()
+        except OSError:
+            memignore_stat = None
+        
+        if memignore_stat is not None:
             try:
-                with open(memignore_path, 'r', encoding='utf-8') as f:
-                    for line_num, line in enumerate(f, 1):
-                        line = line.strip()
-                        # Skip empty lines and comments
-                        if line and not line.startswith('#'):
-                            patterns.append(line)
+                # Unchanged files are served from the cache without re-reading
+                patterns = list(_read_memignore(str(memignore_path), memignore_stat.st_mtime_ns,
+                                                memignore_stat.st_size))
                 
                 memignore_exists = True
                 self._memignore_path = str(memignore_path)
@@ -114,7 +274,7 @@ class MemignoreFilter:
             return None
             
         try:
-            spec = pathspec.PathSpec.from_lines('gitwildmatch', patterns)
+            spec = _compile_pathspec(tuple(patterns))
             logger.debug(f"✅ Created pathspec with {len(patterns)} patterns")
             return spec
         except Exception as e:
@@ -122,7 +282,9 @@ class MemignoreFilter:
             return None
     
     def should_exclude_path(self, file_path: Path, project_root: Path, 
-                           pathspec_obj: Optional[object]) -> Tuple[bool, str]:
+                           pathspec_obj: Optional[object],
+                           is_dir: Optional[bool] = None,
+                           relative_str: Optional[str] = None) -> Tuple[bool, str]:
         """
         Check if a file/directory should be excluded based on .memignore patterns.
         
@@ -130,6 +292,10 @@ class MemignoreFilter:
             file_path: File or directory path to check
             project_root: Project root directory
             pathspec_obj: Compiled pathspec object for pattern matching
+            is_dir: Whether the path is a directory, if already known
+                (saves a stat); checked on disk when omitted
+            relative_str: The path relative to project_root, if already
+                known; derived with Path.relative_to when omitted
             
         Returns:
             Tuple of (should_exclude, reason)
@@ -139,15 +305,17 @@ class MemignoreFilter:
             
         try:
             # Get relative path from project root
-            relative_path = file_path.relative_to(project_root)
-            relative_str = str(relative_path)
+            if relative_str is None:
+                relative_str = str(file_path.relative_to(project_root))
             
             # Check if file/directory matches any .memignore pattern
             if pathspec_obj.match_file(relative_str):
                 return True, f"memignore_pattern:{relative_str}"
                 
             # For directories, also check with trailing slash
-            if file_path.is_dir():
+            if is_dir is None:
+                is_dir = file_path.is_dir()
+            if is_dir:
                 dir_pattern = relative_str + "/"
                 if pathspec_obj.match_file(dir_pattern):
                     return True, f"memignore_directory:{dir_pattern}"
@@ -186,8 +354,9 @@ class MemignoreFilter:
         if custom_memignore_path:
             # Use custom .memignore file
             try:
-                with open(custom_memignore_path, 'r', encoding='utf-8') as f:
-                    patterns = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+                custom_path = os.path.abspath(custom_memignore_path)
+                custom_stat = os.stat(custom_path)
+                patterns = list(_read_memignore(custom_path, custom_stat.st_mtime_ns, custom_stat.st_size))
                 memignore_exists = True
                 self._memignore_path = custom_memignore_path
                 logger.info(f"📋 Using custom .memignore: {custom_memignore_path}")
@@ -208,67 +377,27 @@ class MemignoreFilter:
         # Create pathspec for pattern matching
         pathspec_obj = self.create_pathspec(patterns)
         
-        # Walk directory tree and filter files
+        # Walk directory tree and filter files; top-level subtrees are walked
+        # on worker threads and merged in order, so results match a serial walk
         included_files = []
-        excluded_dirs = set()  # Track excluded directories to avoid traversing them
         
         logger.info(f"🚶 Walking directory tree from: {root_path}")
         
-        for root, dirs, files in os.walk(root_path):
-            current_dir = Path(root)
-            
-            # Skip if current directory is in excluded set
-            if any(current_dir.is_relative_to(excluded_dir) for excluded_dir in excluded_dirs):
-                dirs.clear()  # Don't traverse subdirectories
-                continue
-                
-            # Filter directories in-place to prevent traversal of excluded ones
-            dirs_to_remove = []
-            for dir_name in dirs:
-                dir_path = current_dir / dir_name
-                should_exclude, reason = self.should_exclude_path(dir_path, root_path, pathspec_obj)
-                
-                if should_exclude:
-                    dirs_to_remove.append(dir_name)
-                    excluded_dirs.add(dir_path)
-                    self.stats.exclusion_reasons[reason] = self.stats.exclusion_reasons.get(reason, 0) + 1
-                    logger.debug(f"🚫 Excluding directory: {dir_path} ({reason})")
-                    
-            # Remove excluded directories from traversal
-            for dir_name in dirs_to_remove:
-                dirs.remove(dir_name)
-                
-            # Process files in current directory
-            for file_name in files:
-                file_path = current_dir / file_name
-                self.stats.total_files_found += 1
-                
-                try:
-                    should_exclude, reason = self.should_exclude_path(file_path, root_path, pathspec_obj)
-                    
-                    if should_exclude:
-                        self.stats.total_files_excluded += 1
-                        self.stats.exclusion_reasons[reason] = self.stats.exclusion_reasons.get(reason, 0) + 1
-                        try:
-                            self.stats.total_size_excluded += file_path.stat().st_size
-                        except OSError:
-                            pass
-                        logger.debug(f"🚫 Excluding file: {file_path} ({reason})")
-                        continue
-                        
-                    # File is included
-                    try:
-                        file_size = file_path.stat().st_size
-                        included_files.append(file_path)
-                        self.stats.total_files_included += 1
-                        self.stats.total_size_included += file_size
-                        logger.debug(f"✅ Including file: {file_path} ({file_size} bytes)")
-                    except OSError as e:
-                        logger.warning(f"⚠️  Could not stat file {file_path}: {e}")
-                        
-                except Exception as e:
-                    logger.warning(f"⚠️  Error processing file {file_path}: {e}")
-                    self.stats.exclusion_reasons["processing_error"] = self.stats.exclusion_reasons.get("processing_error", 0) + 1
+        root_dirs, root_files = self._scan_directory(str(root_path))
+        self._filter_directory(root_path, "", root_dirs, root_files, root_path, pathspec_obj,
+                               self.stats, included_files)
+        subtrees = [(entry.path, entry.name + os.sep) for entry in root_dirs if not entry.is_symlink()]
+        
+        if subtrees:
+            max_workers = self.max_workers or min(32, (os.cpu_count() or 1) * 4)
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(subtrees))) as executor:
+                subtree_results = executor.map(
+                    lambda subtree: self._filter_subtree(subtree[0], subtree[1], root_path, pathspec_obj),
+                    subtrees
+                )
+                for subtree_files, subtree_stats in subtree_results:
+                    included_files.extend(subtree_files)
+                    self.stats += subtree_stats
                     
         # Calculate processing time
         self.stats.processing_time_seconds = time.time() - start_time
@@ -281,6 +410,139 @@ class MemignoreFilter:
         
         return included_files
     
+    def _filter_subtree(self, top: str, relative_top: str, root_path: Path,
+                        pathspec_obj: Optional[object]) -> Tuple[List[Path], FilteringStats]:
+        """Filter every file under a top-level directory; runs on a worker thread"""
+        stats = FilteringStats()
+        included_files = []
+        for root, relative_root, dirs, files in self._walk(top, relative_top):
+            self._filter_directory(Path(root), relative_root, dirs, files, root_path, pathspec_obj,
+                                   stats, included_files)
+        return included_files, stats
+    
+    def _filter_directory(self, current_dir: Path, relative_root: str, dirs: List[os.DirEntry],
+                          files: List[os.DirEntry], root_path: Path, pathspec_obj: Optional[object],
+                          stats: FilteringStats, included_files: List[Path]):
+        """Prune excluded entries from dirs in place and collect the directory's included files"""
+        prune_names = getattr(pathspec_obj, "prune_names", {})
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
+        
+        # Filter directories in-place to prevent traversal of excluded ones;
+        # the walk never enters a removed one, so no ancestor check is needed
+        dirs_to_remove = []
+        for dir_entry in dirs:
+            dir_path = current_dir / dir_entry.name
+            relative_str = relative_root + dir_entry.name
+            if dir_entry.name in prune_names:
+                # Excluded by name alone; only the reason needs working out
+                should_exclude = True
+                if prune_names[dir_entry.name] or pathspec_obj.match_file(relative_str):
+                    reason = f"memignore_pattern:{relative_str}"
+                else:
+                    reason = f"memignore_directory:{relative_str}/"
+            else:
+                should_exclude, reason = self.should_exclude_path(dir_path, root_path, pathspec_obj,
+                                                                  is_dir=True, relative_str=relative_str)
+            
+            if should_exclude:
+                dirs_to_remove.append(dir_entry)
+                stats.exclusion_reasons[reason] += 1
+                logger.debug("🚫 Excluding directory: %s (%s)", dir_path, reason)
+                
+        # Remove excluded directories from traversal
+        for dir_entry in dirs_to_remove:
+            dirs.remove(dir_entry)
+            
+        # Process files in current directory
+        for file_entry in files:
+            file_path = current_dir / file_entry.name
+            stats.total_files_found += 1
+            
+            try:
+                should_exclude, reason = self.should_exclude_path(file_path, root_path, pathspec_obj,
+                                                                  is_dir=False,
+                                                                  relative_str=relative_root + file_entry.name)
+                
+                if should_exclude:
+                    stats.total_files_excluded += 1
+                    stats.exclusion_reasons[reason] += 1
+                    try:
+                        stats.total_size_excluded += file_entry.stat().st_size
+                    except OSError:
+                        pass
+                    if debug_enabled:
+                        logger.debug("🚫 Excluding file: %s (%s)", file_path, reason)
+                    continue
+                    
+                # File is included; DirEntry.stat caches its result, and
+                # follows symlinks like Path.stat did
+                try:
+                    file_size = file_entry.stat().st_size
+                    included_files.append(file_path)
+                    stats.total_files_included += 1
+                    stats.total_size_included += file_size
+                    if debug_enabled:
+                        logger.debug("✅ Including file: %s (%d bytes)", file_path, file_size)
+                except OSError as e:
+                    logger.warning(f"⚠️  Could not stat file {file_path}: {e}")
+                    
+            except Exception as e:
+                logger.warning(f"⚠️  Error processing file {file_path}: {e}")
+                stats.exclusion_reasons["processing_error"] += 1
+    
+    def _scan_directory(self, dir_path: str) -> Tuple[List[os.DirEntry], List[os.DirEntry]]:
+        """
+        List a directory as (subdirectory entries, file entries); unreadable ones are empty.
+        
+        Stays on os.scandir rather than batching statx through io_uring: types
+        come from the listing, each file is statted at most once (via
+        DirEntry.stat), and subtrees are walked on threads, which already
+        overlaps syscall latency without a native dependency.
+        """
+        try:
+            with os.scandir(dir_path) as it:
+                entries = list(it)
+        except OSError:
+            return [], []
+        
+        dirs = []
+        files = []
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            
+            if is_dir:
+                dirs.append(entry)
+            else:
+                files.append(entry)
+        
+        return dirs, files
+    
+    def _walk(self, top: str, relative_top: str = "") -> Iterator[Tuple[str, str, List[os.DirEntry], List[os.DirEntry]]]:
+        """
+        Walk a tree top-down like os.walk, yielding DirEntry lists instead of names.
+        
+        Each step is (directory, its relative path with a trailing separator,
+        subdirectory entries, file entries); top's relative path is
+        relative_top, and a child's is a concatenation. Entries carry their
+        type from the directory listing, so callers can tell files from
+        directories without a stat per path. Remove entries from the yielded
+        dirs list to skip them. As with os.walk, symlinked directories are
+        listed but not descended into; unreadable directories are empty.
+        """
+        stack = [(top, relative_top)]
+        while stack:
+            current_dir, relative_dir = stack.pop()
+            dirs, files = self._scan_directory(current_dir)
+            yield current_dir, relative_dir, dirs, files
+            
+            # Visit surviving subdirectories in listing order
+            for entry in reversed(dirs):
+                if not entry.is_symlink():
+                    stack.append((entry.path, relative_dir + entry.name + os.sep))
+    
     def _log_filtering_results(self, project_root: Path, memignore_exists: bool):
         """Log comprehensive filtering results"""
         
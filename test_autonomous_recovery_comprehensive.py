@@ -289,6 +289,76 @@ class TestRecoveryWorkflow(unittest.TestCase):
         if recovery_session.commands_retried:
             self.assertGreater(len(recovery_session.commands_retried), 0)
     
+    def test_command_retry_backoff_jitter(self):
+        """Test that concurrent command retries back off with jittered delays."""
+        # Distinct commands so the recoveries are not coalesced into one session
+        error_analyses = [
+            self.classifier.analyze_error(ErrorContext(
+                command=f"invalidcmd{i} --help",
+                exit_code=127,
+                stdout="",
+                stderr=f"bash: invalidcmd{i}: command not found",
+                execution_time=0.1,
+                working_directory="/project",
+                environment_vars={},
+                timestamp=datetime.now()
+            ))
+            for i in range(4)
+        ]
+        max_retries = self.orchestrator.config['safety_limits']['max_command_retries']
+        
+        sleeps = []
+        
+        async def fake_sleep(delay):
+            sleeps.append(delay)
+        
+        async def run_recoveries():
+            with patch.object(self.orchestrator, '_generate_corrected_commands',
+                              AsyncMock(return_value=["invalidcmd2 --help"] * max_retries)), \
+                 patch('asyncio.sleep', fake_sleep):
+                return await asyncio.gather(*[
+                    self.orchestrator.initiate_recovery(error_analysis) for error_analysis in error_analyses
+                ])
+        
+        sessions = asyncio.run(run_recoveries())
+        
+        # Every session waits between its failed retries
+        self.assertEqual(len(sleeps), len(sessions) * (max_retries - 1))
+        
+        # Delays are jittered within the backoff cap rather than identical
+        self.assertEqual(len(set(sleeps)), len(sleeps))
+        for delay in sleeps:
+            self.assertGreaterEqual(delay, 0)
+            self.assertLessEqual(delay, self.orchestrator.config['max_backoff'])
+    
+    def test_concurrent_identical_recoveries_coalesce(self):
+        """Test that concurrent recoveries of the same error share one session."""
+        context = ErrorContext(
+            command="python app.py",
+            exit_code=1,
+            stdout="",
+            stderr="ModuleNotFoundError: No module named 'flask'",
+            execution_time=0.5,
+            working_directory="/project",
+            environment_vars={},
+            timestamp=datetime.now()
+        )
+        error_analysis = self.classifier.analyze_error(context)
+        
+        async def run_recoveries():
+            return await asyncio.gather(*[
+                self.orchestrator.initiate_recovery(error_analysis) for _ in range(5)
+            ])
+        
+        sessions = asyncio.run(run_recoveries())
+        
+        self.assertTrue(all(session is sessions[0] for session in sessions))
+        self.assertEqual(self.orchestrator.get_recovery_statistics()['total_sessions'], 1)
+        
+        # Once finished, the same error starts a fresh session
+        later_session = asyncio.run(self.orchestrator.initiate_recovery(error_analysis))
+        self.assertIsNot(later_session, sessions[0])
+    
     async def test_multi_step_recovery_workflow(self):
         """Test complex multi-step recovery workflow."""
         # Create complex error requiring multiple steps
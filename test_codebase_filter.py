@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Tests for the codebase filter's file extension handling.
+
+Extensions are derived the way Path.suffix derives them, so names that end
+in a bare dot or only start with one are treated as having no extension.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from core.codebase_filter import CodebaseFilter, _file_extension
+
+
+class TestFileExtension(unittest.TestCase):
+    """Test extension parsing against Path.suffix."""
+    
+    def test_matches_path_suffix(self):
+        """Test that extensions match Path.suffix, lowercased."""
+        names = ['foo.', 'a.tar.', 'w..', '.bashrc', '..foo', '...', 'Makefile',
+                 'app.PY', 'archive.tar.gz', '.a.b', 'a..b']
+        
+        for name in names:
+            self.assertEqual(_file_extension(name), Path(name).suffix.lower(), name)
+    
+    def test_bare_dot_names_are_included(self):
+        """Test that names ending in a bare dot are not rejected by the extension allowlist."""
+        with tempfile.TemporaryDirectory() as project_root:
+            for name in ('foo.', 'a.tar.', 'main.py', 'main.go'):
+                with open(os.path.join(project_root, name), 'w') as f:
+                    f.write('x = 1\n')
+            
+            included = CodebaseFilter().filter_codebase_files(project_root, no_cache=True)
+            
+            self.assertEqual(sorted(path.name for path in included), ['a.tar.', 'foo.', 'main.py'])
+
+
+if __name__ == '__main__':
+    unittest.main()
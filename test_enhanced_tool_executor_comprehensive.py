@@ -22,6 +22,7 @@ Date: 2025-01-26
 """
 
 import asyncio
+import copy
 import json
 import logging
 import os
@@ -249,6 +250,43 @@ class TestEnhancedPromptHandler(unittest.TestCase):
             # Should have minimal or no warnings
             risk_warnings = [w for w in result['warnings'] if 'destructive' in w.lower()]
             self.assertEqual(len(risk_warnings), 0)
+    
+    def test_cached_analysis_isolated_from_caller_mutation(self):
+        """Test that mutating a returned analysis does not affect repeat calls."""
+        test_cases = [
+            "delete all files",
+            "search for TODOs and clean unused files",
+            "fix it",
+            ""
+        ]
+        
+        for request in test_cases:
+            expected = copy.deepcopy(self.handler.analyze_request(request))
+            first = self.handler.analyze_request(request)
+            self.assertEqual(first, expected)
+            
+            first['warnings'].append("caller warning")
+            first['recommendations'].clear()
+            first['metadata']['caller'] = True
+            for option in first.get('clarification_options', []):
+                option['clarification_questions'].append("caller question")
+            if 'intent_decomposition' in first:
+                first['intent_decomposition']['atomic_intents'].clear()
+            
+            self.assertEqual(self.handler.analyze_request(request), expected)
+    
+    def test_cached_analysis_tracks_project_context_changes(self):
+        """Test that editing the project context in place invalidates cached analyses."""
+        handler = EnhancedPromptHandler(project_context={})
+        context = {'files': ['package.json', 'setup.py']}
+        
+        for request in ["clean up the build", "clean up start", "clean up the server start"]:
+            handler.project_context.clear()
+            handler.analyze_request(request)
+            
+            handler.project_context.update(context)
+            expected = EnhancedPromptHandler(project_context=dict(context)).analyze_request(request)
+            self.assertEqual(handler.analyze_request(request), expected)
 
 
 class TestIntegrationScenarios(unittest.TestCase):